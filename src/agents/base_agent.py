@@ -2,6 +2,7 @@
 import asyncio
 import logging
 from abc import ABC, abstractmethod
+from contextvars import ContextVar
 from typing import Any, Dict, List, Optional
 
 from src.core.events import BaseEvent, EventType
@@ -10,6 +11,9 @@ from src.core.kafka_client import KafkaEventConsumer
 
 logger = logging.getLogger(__name__)
 
+# ID of the event currently being processed, used to correlate response events
+_current_event_id: ContextVar[Optional[str]] = ContextVar("current_event_id", default=None)
+
 
 class BaseAgent(ABC):
     """
@@ -105,6 +109,7 @@ class BaseAgent(ABC):
     
     async def _handle_event(self, event: BaseEvent):
         """Internal event handler that wraps process_event with error handling and metrics"""
+        token = _current_event_id.set(event.event_id)
         try:
             logger.debug(f"🎯 Agent {self.agent_id} processing event {event.event_id}")
             
@@ -126,6 +131,8 @@ class BaseAgent(ABC):
             
             # Publish error event for monitoring
             await self._publish_error_event(event, str(e))
+        finally:
+            _current_event_id.reset(token)
     
     async def _publish_error_event(self, original_event: BaseEvent, error_message: str):
         """Publish an error event for monitoring and alerting"""
@@ -165,6 +172,9 @@ class BaseAgent(ABC):
         Returns:
             bool: True if published successfully
         """
+        # Link responses to the event that triggered them (e.g. workflow steps)
+        if event.correlation_id is None:
+            event.correlation_id = _current_event_id.get()
         return await event_bus.publish(event)
     
     def get_health_status(self) -> Dict[str, Any]:
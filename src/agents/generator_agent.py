@@ -9,7 +9,7 @@ from src.agents.base_agent import BaseAgent
 from src.core.events import BaseEvent, EventType, ResumeGeneratedEvent
 from src.core.database import AsyncSessionLocal
 from src.api.models.schema import JobApplication, ResumeVersion
-from src.generator.resume_generator import ResumeGenerator
+from src.generator.resume_generator import default_generator
 from src.generator.llm_interface import get_llm
 
 logger = logging.getLogger(__name__)
@@ -30,8 +30,8 @@ class GeneratorAgent(BaseAgent):
     def __init__(self, cell_id: str = "cell-001"):
         super().__init__("generator-agent", cell_id)
         
-        # Initialize resume generator
-        self.resume_generator = ResumeGenerator()
+        # Shared resume generator (Jinja environment and template cache)
+        self.resume_generator = default_generator()
         
         # Output directory for generated resumes
         self.output_dir = Path("resume_outputs")
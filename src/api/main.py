@@ -11,6 +11,7 @@ from sqlalchemy.ext.asyncio import AsyncEngine
 from src.core.config import settings
 from src.core.database import engine
 from src.core.kafka_client import cleanup_event_producer
+from src.workflows.workflow_engine import workflow_engine
 from src.api.routers import applications, auth, generator, files
 
 
@@ -59,6 +60,17 @@ async def check_kafka_connection() -> bool:
         return True
 
 
+async def start_workflow_engine() -> bool:
+    """Start the workflow engine's agent response listener (optional)"""
+    try:
+        await workflow_engine.start()
+        print("✅ Workflow engine started")
+        return True
+    except Exception as e:
+        print(f"⚠️  Workflow engine failed to start (agent steps will fail): {str(e)}")
+        return True
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncGenerator:
     """Handle startup and shutdown events"""
@@ -77,6 +89,9 @@ async def lifespan(app: FastAPI) -> AsyncGenerator:
     # Check Kafka connection
     await check_kafka_connection()
     
+    # Start listening for agent responses before any workflow dispatches work
+    await start_workflow_engine()
+    
     print(f"\n✅ API ready at http://localhost:{settings.port or 8048}")
     print(f"📚 Documentation at http://localhost:{settings.port or 8048}/docs")
     print(f"🎛️ Kafka UI at http://localhost:9080\n")
@@ -85,6 +100,7 @@ async def lifespan(app: FastAPI) -> AsyncGenerator:
     
     # Shutdown
     print("\n👋 Gracefully shutting down...")
+    await workflow_engine.shutdown()
     await cleanup_event_producer()
 
 
@@ -133,6 +133,10 @@ class Settings(BaseSettings):
     
     # Local storage path (for development)
     local_storage_path: str = "./storage"
+    
+    # Compiled resume PDF cache (development aid; resumes are rarely recompiled in production)
+    resume_pdf_cache_enabled: bool = False
+    resume_pdf_cache_max_files: int = 200
 
 
     class Config:
@@ -1,10 +1,21 @@
 # src/core/database.py
+import orjson
 from sqlalchemy import create_engine
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
 
 from src.core.config import settings
 
+
+def _json_serializer(obj) -> str:
+    """Serialize JSON columns with orjson (native datetime support, canonical key order)"""
+    return orjson.dumps(
+        obj,
+        default=str,
+        option=orjson.OPT_NAIVE_UTC | orjson.OPT_SORT_KEYS
+    ).decode()
+
+
 # Async engine for FastAPI with connection pooling settings
 engine = create_async_engine(
     settings.async_database_url,
@@ -13,6 +24,8 @@ engine = create_async_engine(
     max_overflow=10,     # Maximum overflow connections
     pool_timeout=30,     # Timeout before giving up on getting a connection
     echo=False,          # Set to True for SQL query logging
+    json_serializer=_json_serializer,
+    json_deserializer=orjson.loads,
 )
 
 AsyncSessionLocal = sessionmaker(
@@ -40,12 +40,29 @@ class EventBus:
             logger.error(f"❌ Failed to publish event: {e}")
             return False
     
-    def create_consumer(self, group_id: str, topics: List[str]) -> KafkaEventConsumer:
+    async def publish_many(self, events: List[BaseEvent]) -> bool:
+        """
+        Publish several events in a single batch
+        
+        Args:
+            events: The events to publish
+            
+        Returns:
+            bool: True if all events were published successfully
+        """
+        try:
+            producer = await get_event_producer()
+            return await producer.publish_events(events)
+        except Exception as e:
+            logger.error(f"❌ Failed to publish {len(events)} events: {e}")
+            return False
+    
+    def create_consumer(self, group_id: Optional[str], topics: List[str]) -> KafkaEventConsumer:
         """
         Create a new event consumer
         
         Args:
-            group_id: Consumer group ID
+            group_id: Consumer group ID (None to read every partition outside any group)
             topics: List of topics to subscribe to
             
         Returns:
@@ -1,7 +1,7 @@
 # src/core/kafka_client.py
 import asyncio
-import json
 import logging
+import orjson
 from typing import Any, Callable, Dict, List, Optional
 from aiokafka import AIOKafkaProducer, AIOKafkaConsumer
 from aiokafka.errors import KafkaConnectionError
@@ -12,6 +12,15 @@ from src.core.events import BaseEvent, EventType
 logger = logging.getLogger(__name__)
 
 
+def _serialize_value(value) -> bytes:
+    """Serialize event payloads with orjson (native datetime, UUID and enum support)"""
+    return orjson.dumps(
+        value,
+        default=str,
+        option=orjson.OPT_NON_STR_KEYS
+    )
+
+
 class KafkaEventProducer:
     """Kafka producer for publishing events"""
     
@@ -24,7 +33,7 @@ class KafkaEventProducer:
         try:
             self.producer = AIOKafkaProducer(
                 bootstrap_servers=self.bootstrap_servers,
-                value_serializer=lambda v: json.dumps(v, default=str).encode('utf-8'),
+                value_serializer=_serialize_value,
                 key_serializer=lambda k: k.encode('utf-8') if k else None,
                 retry_backoff_ms=1000,
                 request_timeout_ms=30000,
@@ -61,7 +70,7 @@ class KafkaEventProducer:
         
         try:
             # Use event type as topic if not specified
-            topic = topic or f"resume-automation.{event.event_type.value}"
+            topic = topic or f"resume-automation.{EventType(event.event_type).value}"
             
             # Use user_id as partition key for even distribution
             key = f"user_{event.user_id}"
@@ -82,12 +91,47 @@ class KafkaEventProducer:
         except Exception as e:
             logger.error(f"❌ Failed to publish event {event.event_id}: {e}")
             return False
+    
+    async def publish_events(self, events: List[BaseEvent]) -> bool:
+        """
+        Publish several events to Kafka as one producer batch
+        
+        Sends are queued without waiting so the producer can batch them,
+        then all delivery futures are awaited together.
+        
+        Args:
+            events: The events to publish
+        
+        Returns:
+            bool: True if all events were published successfully
+        """
+        if not self.producer:
+            logger.error("Kafka producer not started")
+            return False
+        
+        try:
+            deliveries = []
+            for event in events:
+                deliveries.append(await self.producer.send(
+                    topic=f"resume-automation.{EventType(event.event_type).value}",
+                    key=f"user_{event.user_id}",
+                    value=event.model_dump()
+                ))
+            
+            await asyncio.gather(*deliveries)
+            
+            logger.debug(f"📤 Published batch of {len(events)} events")
+            return True
+            
+        except Exception as e:
+            logger.error(f"❌ Failed to publish batch of {len(events)} events: {e}")
+            return False
 
 
 class KafkaEventConsumer:
-    """Kafka consumer for processing events"""
+    """Kafka consumer for processing events (group_id=None reads every partition without joining a group)"""
     
-    def __init__(self, group_id: str, topics: List[str]):
+    def __init__(self, group_id: Optional[str], topics: List[str]):
         self.group_id = group_id
         self.topics = topics
         self.consumer: Optional[AIOKafkaConsumer] = None
@@ -102,10 +146,10 @@ class KafkaEventConsumer:
                 *self.topics,
                 bootstrap_servers=self.bootstrap_servers,
                 group_id=self.group_id,
-                value_deserializer=lambda m: json.loads(m.decode('utf-8')),
+                value_deserializer=orjson.loads,
                 key_deserializer=lambda k: k.decode('utf-8') if k else None,
                 auto_offset_reset='latest',
-                enable_auto_commit=True,
+                enable_auto_commit=self.group_id is not None,
                 auto_commit_interval_ms=5000,
             )
             await self.consumer.start()
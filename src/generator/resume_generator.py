@@ -1,16 +1,76 @@
+import asyncio
+import os
 import subprocess
 import tempfile
 import shutil
 from pathlib import Path
-from typing import Dict, Any
-from jinja2 import Environment, FileSystemLoader, select_autoescape
+from typing import Dict, Any, List, Optional, Tuple
+from jinja2 import Environment, FileSystemLoader, Template, select_autoescape
 import hashlib
-from datetime import datetime
+import heapq
+from functools import cache, lru_cache
+from datetime import date, datetime
 
+from src.core.config import settings
 from src.api.models.schema import ResumeVersion, JobApplication
 from src.api.models.auth import User
 from sqlalchemy.ext.asyncio import AsyncSession
 
+# LaTeX special characters and their escaped forms
+_LATEX_ESCAPES = str.maketrans({
+    '\\': r'\textbackslash ',  # Use space instead of {}
+    '&': r'\&',
+    '%': r'\%',
+    '$': r'\$',
+    '#': r'\#',
+    '^': r'\textasciicircum ',
+    '_': r'\_',
+    '~': r'\textasciitilde ',
+    '{': r'\{',
+    '}': r'\}',
+    '<': r'\textless ',
+    '>': r'\textgreater ',
+    '|': r'\textbar ',
+    '"': r"''",  # Convert quotes to LaTeX style
+    '[': r'{[}',  # Protect square brackets
+    ']': r'{]}',
+})
+
+# Characters the table above rewrites; text without any is returned as-is
+_LATEX_SPECIAL_CHARS = frozenset(map(chr, _LATEX_ESCAPES))
+
+# Joins fields for batch escaping; NUL never appears in TeX input or the escape table
+_BATCH_SEPARATOR = "\x00\x01"
+
+# pdflatex options: no terminal chatter, stop at the first error, no shell escape
+_PDFLATEX_FLAGS = ("-interaction=batchmode", "-halt-on-error", "-no-shell-escape")
+
+# Commands that need a second pdflatex pass to resolve
+_CROSS_REFERENCE_MARKERS = ("\\ref", "\\pageref", "\\cite", "\\tableofcontents", "lastpage")
+
+# Lines of the pdflatex log included in compilation errors
+_LOG_TAIL_LINES = 50
+
+# Compiled PDFs keyed by a hash of the pdflatex version and LaTeX source (opt-in, see settings)
+_PDF_CACHE_DIR = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "resume-automation" / "resume_pdf"
+
+
+@lru_cache(maxsize=4096)
+def _escape_cached(text: str) -> str:
+    """Escape a string containing LaTeX specials; repeated field values hit the cache"""
+    # Single pass over the text; nothing is re-escaped
+    return text.translate(_LATEX_ESCAPES)
+
+
+@lru_cache(maxsize=1)
+def pdflatex_version() -> Optional[str]:
+    """First line of `pdflatex --version`, or None if pdflatex is unavailable; probed once per process"""
+    try:
+        result = subprocess.run(["pdflatex", "--version"], capture_output=True, text=True)
+    except OSError:
+        return None
+    return result.stdout.split('\n', 1)[0] if result.returncode == 0 else None
+
 
 class ResumeGenerator:
     def __init__(self):
@@ -20,87 +80,225 @@ class ResumeGenerator:
             loader=FileSystemLoader(template_dir),
             autoescape=select_autoescape(['html', 'xml']),
             trim_blocks=True,
-            lstrip_blocks=True
+            lstrip_blocks=True,
+            auto_reload=settings.debug  # Skip the per-render mtime check outside debug
         )
         
+        # Loaded templates by file name
+        self._templates: Dict[str, Template] = {}
+        
         # Add LaTeX escaping filter
         self.env.filters['latex_escape'] = self._latex_escape
+        self.env.filters['latex_escape_all'] = self._latex_escape_all
         
         # Create output directory
         self.output_dir = Path("resume_outputs")
         self.output_dir.mkdir(exist_ok=True)
+        
+        # Compiled PDFs by source hash, shared across runs; None when caching is off
+        self.pdf_cache_dir: Optional[Path] = _PDF_CACHE_DIR if settings.resume_pdf_cache_enabled else None
     
     def _latex_escape(self, text):
         """Escape special LaTeX characters"""
         if not isinstance(text, str):
             return text
         
-        # LaTeX special characters that need escaping
-        # Order matters: backslash must be first to avoid double-escaping
-        replacements = [
-            ('\\', r'\textbackslash '),  # Must be first, use space instead of {}
-            ('&', r'\&'),
-            ('%', r'\%'),
-            ('$', r'\$'),
-            ('#', r'\#'),
-            ('^', r'\textasciicircum '),
-            ('_', r'\_'),
-            ('~', r'\textasciitilde '),
-            ('{', r'\{'),
-            ('}', r'\}'),
-            ('<', r'\textless '),
-            ('>', r'\textgreater '),
-            ('|', r'\textbar '),
-            ('"', r"''"),  # Convert quotes to LaTeX style
-            ('[', r'{[}'),  # Protect square brackets
-            (']', r'{]}'),
-        ]
-        
-        for char, escaped in replacements:
-            text = text.replace(char, escaped)
-        
-        return text
+        # Most fields (dates, plain names) need no escaping at all
+        if _LATEX_SPECIAL_CHARS.isdisjoint(text):
+            return text
+        
+        return _escape_cached(text)
+    
+    def _latex_escape_all(self, values) -> List[Any]:
+        """Escape a list of fields with one pass over their joined text"""
+        values = list(values)
+        if not all(isinstance(value, str) for value in values):
+            return [self._latex_escape(value) for value in values]
+        
+        joined = _BATCH_SEPARATOR.join(values)
+        if joined.count(_BATCH_SEPARATOR) != len(values) - 1:
+            # A field already contains the separator; splitting back would be ambiguous
+            return [self._latex_escape(value) for value in values]
+        
+        return self._latex_escape(joined).split(_BATCH_SEPARATOR)
+    
+    def _get_template(self, template_name: str) -> Template:
+        """Get a compiled template, reusing it across renders unless auto-reloading"""
+        template = self._templates.get(template_name)
+        if template is None:
+            template = self.env.get_template(f"{template_name}.tex")
+            if not self.env.auto_reload:
+                self._templates[template_name] = template
+        return template
     
     def generate_latex(self, template_name: str, data: Dict[str, Any]) -> str:
         """Generate LaTeX content from template and data"""
-        template = self.env.get_template(f"{template_name}.tex")
+        template = self._get_template(template_name)
         return template.render(**data)
     
+    def _prepare_compilation(self, latex_content: str, temp_dir: str) -> Tuple[Path, List[List[str]]]:
+        """Write the LaTeX source and plan the pdflatex passes for it"""
+        temp_path = Path(temp_dir)
+        
+        # Write LaTeX content to file
+        tex_file = temp_path / "resume.tex"
+        tex_file.write_text(latex_content, encoding='utf-8')
+        
+        # Cross-references need a draft pass to write the .aux file first;
+        # documents without them render completely in a single pass
+        command = ["pdflatex", *_PDFLATEX_FLAGS, "-output-directory", temp_dir, str(tex_file)]
+        if any(marker in latex_content for marker in _CROSS_REFERENCE_MARKERS):
+            passes = [[command[0], "-draftmode", *command[1:]], command]
+        else:
+            passes = [command]
+        
+        return temp_path / "resume.pdf", passes
+    
+    def _compilation_error(
+        self,
+        pdf_path: Path,
+        run: int,
+        passes: List[List[str]],
+        returncode: int
+    ) -> Optional[Exception]:
+        """Check a finished pdflatex pass, returning the error to raise if it failed"""
+        # Draft passes write no PDF, so only the final pass can be checked for one
+        if run < len(passes):
+            if returncode == 0:
+                return None
+        elif pdf_path.exists():
+            return None
+        
+        # pdflatex output is discarded; the log is only read once something failed
+        log_file = pdf_path.with_suffix(".log")
+        log_tail = ""
+        if log_file.exists():
+            log_lines = log_file.read_text(encoding='utf-8', errors='replace').splitlines()
+            log_tail = "\n".join(log_lines[-_LOG_TAIL_LINES:])
+        error_msg = f"LaTeX compilation failed - no PDF generated (run {run}/{len(passes)}):\n"
+        error_msg += f"Return code: {returncode}\n"
+        error_msg += f"LOG (last {_LOG_TAIL_LINES} lines):\n{log_tail}\n"
+        error_msg += f"Command: {' '.join(passes[run - 1])}"
+        return Exception(error_msg)
+    
+    def _pdf_cache_path(self, latex_content: str) -> Optional[Path]:
+        """Cache location for the PDF compiled from this LaTeX source, or None if caching is off"""
+        if self.pdf_cache_dir is None:
+            return None
+        
+        key = hashlib.sha256()
+        key.update((pdflatex_version() or "").encode())
+        key.update(b"\0")
+        key.update(latex_content.encode())
+        
+        # \today makes the output depend on the date as well as the source
+        if "\\today" in latex_content:
+            key.update(date.today().isoformat().encode())
+        
+        return self.pdf_cache_dir / f"{key.hexdigest()}.pdf"
+    
+    def _copy_cached_pdf(self, cache_path: Path, output_filename: str) -> Optional[str]:
+        """Copy a previously compiled PDF to the output directory, if one is cached"""
+        if cache_path is None or not cache_path.exists():
+            return None
+        
+        output_path = self.output_dir / output_filename
+        try:
+            shutil.copyfile(cache_path, output_path)
+            os.utime(cache_path)  # Mark as recently used for eviction
+        except OSError:
+            # Evicted by another process in the meantime; compile instead
+            return None
+        return str(output_path)
+    
+    def _trim_pdf_cache(self):
+        """Delete the least recently used cached PDFs beyond the configured limit"""
+        entries = []
+        for path in self.pdf_cache_dir.glob("*.pdf"):
+            try:
+                entries.append((path.stat().st_mtime, path))
+            except OSError:
+                continue
+        
+        excess = len(entries) - settings.resume_pdf_cache_max_files
+        if excess > 0:
+            for _, path in heapq.nsmallest(excess, entries):
+                path.unlink(missing_ok=True)
+    
+    def _store_pdf(self, pdf_path: Path, output_filename: str, cache_path: Optional[Path]) -> str:
+        """Cache a compiled PDF (when caching is on) and move it to the output directory"""
+        if cache_path is not None:
+            try:
+                # Copy to a unique temporary file so readers never see a partial file
+                # and concurrent compiles of the same content never share one
+                cache_path.parent.mkdir(parents=True, exist_ok=True)
+                fd, partial_name = tempfile.mkstemp(dir=cache_path.parent, suffix=".tmp")
+                try:
+                    with os.fdopen(fd, "wb") as partial, open(pdf_path, "rb") as compiled:
+                        shutil.copyfileobj(compiled, partial)
+                    os.replace(partial_name, cache_path)
+                except OSError:
+                    os.unlink(partial_name)
+                    raise
+                self._trim_pdf_cache()
+            except OSError:
+                # The cache is an optimization; compilation already succeeded
+                pass
+        
+        output_path = self.output_dir / output_filename
+        
+        # Use shutil.move() to handle cross-device moves
+        shutil.move(str(pdf_path), str(output_path))
+        
+        return str(output_path)
+    
     def compile_latex_to_pdf(self, latex_content: str, output_filename: str) -> str:
         """Compile LaTeX content to PDF"""
+        cache_path = self._pdf_cache_path(latex_content)
+        cached = self._copy_cached_pdf(cache_path, output_filename)
+        if cached:
+            return cached
+        
         with tempfile.TemporaryDirectory() as temp_dir:
-            temp_path = Path(temp_dir)
-            
-            # Write LaTeX content to file
-            tex_file = temp_path / "resume.tex"
-            tex_file.write_text(latex_content, encoding='utf-8')
+            pdf_path, passes = self._prepare_compilation(latex_content, temp_dir)
             
-            # Compile LaTeX to PDF (run twice for proper rendering)
-            for i in range(2):
+            for run, args in enumerate(passes, 1):
                 result = subprocess.run(
-                    ["pdflatex", "-interaction=nonstopmode", "-output-directory", temp_dir, str(tex_file)],
-                    capture_output=True,
-                    text=True
+                    args,
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL
                 )
                 
-                # Check if PDF was created successfully (more important than return code)
-                pdf_path = temp_path / "resume.pdf"
-                if not pdf_path.exists():
-                    error_msg = f"LaTeX compilation failed - no PDF generated (run {i+1}/2):\n"
-                    error_msg += f"Return code: {result.returncode}\n"
-                    error_msg += f"STDOUT: {result.stdout}\n"
-                    error_msg += f"STDERR: {result.stderr}\n"
-                    error_msg += f"Command: pdflatex -interaction=nonstopmode -output-directory {temp_dir} {tex_file}"
-                    raise Exception(error_msg)
+                error = self._compilation_error(pdf_path, run, passes, result.returncode)
+                if error:
+                    raise error
             
-            # Move PDF to output directory
-            pdf_path = temp_path / "resume.pdf"
-            output_path = self.output_dir / output_filename
+            return self._store_pdf(pdf_path, output_filename, cache_path)
+    
+    async def compile_latex_to_pdf_async(self, latex_content: str, output_filename: str) -> str:
+        """Compile LaTeX content to PDF without blocking the event loop"""
+        # The version probe and file copies block, so they run in a worker thread
+        cache_path = await asyncio.to_thread(self._pdf_cache_path, latex_content)
+        cached = await asyncio.to_thread(self._copy_cached_pdf, cache_path, output_filename)
+        if cached:
+            return cached
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            pdf_path, passes = self._prepare_compilation(latex_content, temp_dir)
             
-            # Use shutil.move() to handle cross-device moves
-            shutil.move(str(pdf_path), str(output_path))
+            for run, args in enumerate(passes, 1):
+                process = await asyncio.create_subprocess_exec(
+                    *args,
+                    stdout=asyncio.subprocess.DEVNULL,
+                    stderr=asyncio.subprocess.DEVNULL
+                )
+                await process.wait()
+                
+                error = self._compilation_error(pdf_path, run, passes, process.returncode)
+                if error:
+                    raise error
             
-            return str(output_path)
+            return await asyncio.to_thread(self._store_pdf, pdf_path, output_filename, cache_path)
     
     def generate_content_hash(self, content: str) -> str:
         """Generate hash of resume content for deduplication"""
@@ -120,11 +318,12 @@ class ResumeGenerator:
         latex_content = self.generate_latex(template_name, resume_data)
         
         # Generate unique filename
-        timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
+        now = datetime.utcnow()
+        timestamp = now.strftime("%Y%m%d_%H%M%S")
         filename = f"resume_{user.id}_{job_application.id}_{timestamp}.pdf"
         
         # Compile to PDF
-        pdf_path = self.compile_latex_to_pdf(latex_content, filename)
+        pdf_path = await self.compile_latex_to_pdf_async(latex_content, filename)
         
         # Create database record
         resume_version = ResumeVersion(
@@ -138,18 +337,30 @@ class ResumeGenerator:
                 "job_application_id": job_application.id,
                 "company": job_application.company,
                 "position": job_application.position,
-                "generated_at": datetime.utcnow().isoformat()
+                "generated_at": now  # Serialized natively by the engine's orjson serializer
             }
         )
         
         if db:
-            db.add(resume_version)
-            await db.commit()
-            await db.refresh(resume_version)
-            
-            # Update job application with resume
-            job_application.resume_version = resume_version.version_name
-            job_application.resume_url = pdf_path
-            await db.commit()
+            try:
+                # Flush assigns the primary key without ending the transaction
+                db.add(resume_version)
+                await db.flush()
+
+                # Update job application with resume
+                job_application.resume_version = resume_version.version_name
+                job_application.resume_url = pdf_path
+
+                # Single commit for both writes
+                await db.commit()
+            except Exception:
+                await db.rollback()
+                raise
         
         return resume_version
+
+
+@cache
+def default_generator() -> ResumeGenerator:
+    """Shared ResumeGenerator, created on first use"""
+    return ResumeGenerator()
@@ -2,17 +2,64 @@
 import asyncio
 import logging
 from abc import ABC, abstractmethod
+from collections import ChainMap
 from datetime import datetime
 from enum import Enum
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+import time
 import uuid
 
-from src.core.events import BaseEvent
+from src.core.events import BaseEvent, EventType
 from src.core.event_bus import event_bus
+from src.core.kafka_client import KafkaEventConsumer
 
 logger = logging.getLogger(__name__)
 
 
+def _to_datetime(ts: Optional[float]) -> Optional[datetime]:
+    """Convert an epoch timestamp to a naive UTC datetime"""
+    return datetime.utcfromtimestamp(ts) if ts is not None else None
+
+
+def _iso(ts: Optional[float]) -> Optional[str]:
+    """Format an epoch timestamp as an ISO 8601 string, only when serializing"""
+    return datetime.utcfromtimestamp(ts).isoformat() if ts is not None else None
+
+
+# Event types agents publish when they finish (or fail) a dispatched task
+AGENT_RESPONSE_EVENT_TYPES = [
+    EventType.JOB_ANALYZED,
+    EventType.RESUME_GENERATED,
+    EventType.RESUME_OPTIMIZED,
+    EventType.AGENT_HEALTH_CHECK,  # Agents report processing errors on this topic
+]
+
+# Map step handlers to the event types that dispatch work to them
+_AGENT_EVENT_TYPE = {
+    "scraper-agent": EventType.JOB_DISCOVERED,
+    "analyzer-agent": EventType.JOB_ANALYZED,
+    "generator-agent": EventType.RESUME_GENERATION_REQUESTED,
+    "optimizer-agent": EventType.RESUME_OPTIMIZATION_REQUESTED
+}
+
+# Event type each agent publishes once it has handled a dispatched step.
+# Handlers missing here (scraper-agent) never answer, so their steps
+# complete as soon as the dispatch is published.
+_AGENT_RESPONSE_TYPE = {
+    "analyzer-agent": EventType.JOB_ANALYZED,
+    "generator-agent": EventType.RESUME_GENERATED,
+    "optimizer-agent": EventType.RESUME_OPTIMIZED
+}
+
+# Map workflow lifecycle events to event types
+_WORKFLOW_EVENT_TYPE = {
+    "started": EventType.WORKFLOW_STARTED,
+    "completed": EventType.WORKFLOW_COMPLETED,
+    "failed": EventType.WORKFLOW_FAILED,
+    "cancelled": EventType.WORKFLOW_FAILED  # Use same type with different data
+}
+
+
 class WorkflowStatus(str, Enum):
     PENDING = "pending"
     RUNNING = "running"
@@ -34,6 +81,13 @@ class StepStatus(str, Enum):
 class WorkflowStep:
     """Individual step in a workflow"""
     
+    __slots__ = (
+        "step_id", "name", "handler", "input_data", "timeout_seconds",
+        "retry_count", "retry_delay", "required", "depends_on", "_static_dict",
+        "_status", "_status_str", "_started", "_completed",
+        "output_data", "error_message", "current_retry", "_on_change"
+    )
+    
     def __init__(
         self,
         step_id: str,
@@ -43,7 +97,8 @@ class WorkflowStep:
         timeout_seconds: int = 300,
         retry_count: int = 3,
         retry_delay: int = 5,
-        required: bool = True
+        required: bool = True,
+        depends_on: List[str] = None
     ):
         self.step_id = step_id
         self.name = name
@@ -53,30 +108,54 @@ class WorkflowStep:
         self.retry_count = retry_count
         self.retry_delay = retry_delay
         self.required = required
+        self.depends_on = tuple(depends_on or ())
+        
+        # Immutable fields shared by every to_dict() call
+        self._static_dict = {
+            "step_id": step_id,
+            "name": name,
+            "handler": handler,
+            "max_retries": retry_count,
+            "depends_on": list(self.depends_on)
+        }
+        
+        # Optional callback fired whenever the step changes state
+        self._on_change: Optional[Callable[[], None]] = None
         
         # Runtime state
         self.status = StepStatus.PENDING
-        self.started_at: Optional[datetime] = None
-        self.completed_at: Optional[datetime] = None
+        self._started: Optional[float] = None
+        self._completed: Optional[float] = None
         self.output_data: Dict[str, Any] = {}
         self.error_message: Optional[str] = None
         self.current_retry = 0
     
+    @property
+    def status(self) -> StepStatus:
+        return self._status
+    
+    @status.setter
+    def status(self, value: StepStatus):
+        self._status = value
+        self._status_str = value.value
+        if self._on_change is not None:
+            self._on_change()
+    
     def start(self):
         """Mark step as started"""
         self.status = StepStatus.RUNNING
-        self.started_at = datetime.utcnow()
+        self._started = time.time()
     
     def complete(self, output_data: Dict[str, Any] = None):
         """Mark step as completed"""
         self.status = StepStatus.COMPLETED
-        self.completed_at = datetime.utcnow()
+        self._completed = time.time()
         self.output_data = output_data or {}
     
     def fail(self, error_message: str):
         """Mark step as failed"""
         self.status = StepStatus.FAILED
-        self.completed_at = datetime.utcnow()
+        self._completed = time.time()
         self.error_message = error_message
     
     def retry(self):
@@ -88,14 +167,22 @@ class WorkflowStep:
     def skip(self, reason: str = ""):
         """Mark step as skipped"""
         self.status = StepStatus.SKIPPED
-        self.completed_at = datetime.utcnow()
+        self._completed = time.time()
         self.error_message = reason
     
+    @property
+    def started_at(self) -> Optional[datetime]:
+        return _to_datetime(self._started)
+    
+    @property
+    def completed_at(self) -> Optional[datetime]:
+        return _to_datetime(self._completed)
+    
     @property
     def duration_seconds(self) -> Optional[float]:
         """Calculate step duration"""
-        if self.started_at and self.completed_at:
-            return (self.completed_at - self.started_at).total_seconds()
+        if self._started is not None and self._completed is not None:
+            return self._completed - self._started
         return None
     
     @property
@@ -106,15 +193,12 @@ class WorkflowStep:
     def to_dict(self) -> Dict[str, Any]:
         """Convert step to dictionary"""
         return {
-            "step_id": self.step_id,
-            "name": self.name,
-            "handler": self.handler,
-            "status": self.status.value,
-            "started_at": self.started_at.isoformat() if self.started_at else None,
-            "completed_at": self.completed_at.isoformat() if self.completed_at else None,
+            **self._static_dict,
+            "status": self._status_str,
+            "started_at": _iso(self._started),
+            "completed_at": _iso(self._completed),
             "duration_seconds": self.duration_seconds,
             "current_retry": self.current_retry,
-            "max_retries": self.retry_count,
             "error_message": self.error_message,
             "output_data": self.output_data
         }
@@ -128,24 +212,102 @@ class BaseWorkflow(ABC):
     to accomplish complex tasks like job application automation
     """
     
+    # Subclasses must declare __slots__ (enforced in __init_subclass__)
+    __slots__ = (
+        "workflow_id", "user_id", "_status", "_status_str",
+        "_created", "_started", "_completed", "steps",
+        "current_step_index", "_completed_count", "context", "error_message",
+        "_pending_events", "_resume_event", "_done_event", "_static_dict",
+        "_status_listener", "_dict_cache", "_dirty", "_step_tasks"
+    )
+    
+    # Step definitions shared by all instances - defined by subclasses
+    _STEP_TEMPLATES: tuple = ()
+    
+    # Futures awaiting agent responses, keyed by the dispatched event ID,
+    # with the handler expected to answer and its response event type
+    _pending: Dict[str, Tuple[asyncio.Future, str, EventType]] = {}
+    
+    # Process-wide consumer routing agent responses to the futures above
+    _response_consumer: Optional[KafkaEventConsumer] = None
+    _response_task: Optional[asyncio.Task] = None
+    _response_lock = asyncio.Lock()
+    
+    def __init_subclass__(cls, **kwargs):
+        """Require subclasses to declare __slots__ so instances stay dict-free"""
+        super().__init_subclass__(**kwargs)
+        if "__slots__" not in cls.__dict__:
+            raise TypeError(f"{cls.__name__} must declare __slots__ (use () if it adds no attributes)")
+    
     def __init__(self, workflow_id: str = None, user_id: int = None):
-        self.workflow_id = workflow_id or str(uuid.uuid4())
+        self.workflow_id = workflow_id or uuid.uuid4().hex
         self.user_id = user_id
+        
+        # Memoized to_dict() result, rebuilt after any state change
+        self._dict_cache: Optional[Dict[str, Any]] = None
+        self._dirty = True
+        
+        # Optional callback(workflow, previous_status) fired on status changes
+        self._status_listener: Optional[Callable[["BaseWorkflow", Optional[WorkflowStatus]], None]] = None
         self.status = WorkflowStatus.PENDING
-        self.created_at = datetime.utcnow()
-        self.started_at: Optional[datetime] = None
-        self.completed_at: Optional[datetime] = None
+        self._created = time.time()
+        self._started: Optional[float] = None
+        self._completed: Optional[float] = None
         
         # Workflow state
         self.steps: List[WorkflowStep] = []
         self.current_step_index = 0
+        self._completed_count = 0
         self.context: Dict[str, Any] = {}
         self.error_message: Optional[str] = None
         
+        # Events queued for the next batched publish
+        self._pending_events: List[BaseEvent] = []
+        
+        # Cleared while paused so the run loop can wait for resume()
+        self._resume_event = asyncio.Event()
+        self._resume_event.set()
+        
+        # Set once the workflow reaches a terminal state
+        self._done_event = asyncio.Event()
+        
+        # Tasks of the steps currently in flight, so cancel() can stop them
+        self._step_tasks: Dict[asyncio.Task, WorkflowStep] = {}
+        
         # Initialize workflow steps
         self._initialize_steps()
         
-        logger.info(f"🔄 Workflow {self.workflow_id} initialized with {len(self.steps)} steps")
+        # Immutable fields shared by every to_dict() call
+        self._static_dict = {
+            "workflow_id": self.workflow_id,
+            "workflow_type": self.workflow_type,
+            "user_id": self.user_id,
+            "created_at": _iso(self._created)
+        }
+        
+        logger.info("🔄 Workflow %s initialized with %d steps", self.workflow_id, len(self.steps))
+    
+    @property
+    def status(self) -> WorkflowStatus:
+        return self._status
+    
+    @status.setter
+    def status(self, value: WorkflowStatus):
+        previous = getattr(self, "_status", None)  # Unset during __init__
+        self._status = value
+        self._status_str = value.value
+        self._dirty = True
+        if self._status_listener is not None:
+            self._status_listener(self, previous)
+    
+    @property
+    def status_listener(self) -> Optional[Callable[["BaseWorkflow", Optional[WorkflowStatus]], None]]:
+        """Callback(workflow, previous_status) fired on status changes"""
+        return self._status_listener
+    
+    @status_listener.setter
+    def status_listener(self, listener: Optional[Callable[["BaseWorkflow", Optional[WorkflowStatus]], None]]):
+        self._status_listener = listener
     
     @property
     @abstractmethod
@@ -153,10 +315,79 @@ class BaseWorkflow(ABC):
         """Return the workflow type name"""
         pass
     
-    @abstractmethod
     def _initialize_steps(self):
-        """Initialize the workflow steps - implemented by subclasses"""
-        pass
+        """Initialize the workflow steps from the class-level step templates"""
+        for template in type(self)._STEP_TEMPLATES:
+            self.add_step(**template)
+    
+    @staticmethod
+    async def start_response_listener():
+        """Start the consumer that routes agent responses to waiting steps, once per process at startup"""
+        async with BaseWorkflow._response_lock:
+            if BaseWorkflow._response_task is not None:
+                return
+            
+            # Only the process that dispatched a step holds its future, so every
+            # process reads all responses itself instead of sharing a consumer group
+            consumer = event_bus.create_consumer(
+                group_id=None,
+                topics=[f"resume-automation.{event_type.value}" for event_type in AGENT_RESPONSE_EVENT_TYPES]
+            )
+            for event_type in AGENT_RESPONSE_EVENT_TYPES:
+                consumer.register_handler(event_type, BaseWorkflow._handle_agent_response)
+            
+            await consumer.start()
+            BaseWorkflow._response_consumer = consumer
+            BaseWorkflow._response_task = asyncio.create_task(consumer.consume_events())
+            BaseWorkflow._response_task.add_done_callback(BaseWorkflow._on_response_listener_done)
+            
+            logger.info("👂 Listening for agent responses")
+    
+    @staticmethod
+    async def stop_response_listener():
+        """Stop the agent response consumer and fail any steps still waiting on it"""
+        async with BaseWorkflow._response_lock:
+            task, BaseWorkflow._response_task = BaseWorkflow._response_task, None
+            consumer, BaseWorkflow._response_consumer = BaseWorkflow._response_consumer, None
+            if task is None:
+                return
+            
+            task.cancel()
+            await consumer.stop()
+            if consumer in event_bus.consumers:
+                event_bus.consumers.remove(consumer)
+            
+            for future, _, _ in BaseWorkflow._pending.values():
+                if not future.done():
+                    future.set_exception(Exception("Agent response listener stopped"))
+    
+    @staticmethod
+    def _on_response_listener_done(task: asyncio.Task):
+        """Allow the listener to be restarted if consumption stops unexpectedly"""
+        if task is BaseWorkflow._response_task:
+            BaseWorkflow._response_task = None
+            BaseWorkflow._response_consumer = None
+            if not task.cancelled() and task.exception() is not None:
+                logger.error("❌ Agent response listener stopped: %s", task.exception())
+    
+    @staticmethod
+    async def _handle_agent_response(event: BaseEvent):
+        """Resolve the step future waiting on the event an agent responded to"""
+        pending = BaseWorkflow._pending.get(event.correlation_id) if event.correlation_id else None
+        if pending is None:
+            return
+        
+        future, handler, response_type = pending
+        if future.done():
+            return
+        
+        # Several agents consume some dispatch types, so only the handler's own
+        # response (or its own error report) settles the step
+        if event.event_type == EventType.AGENT_HEALTH_CHECK:
+            if event.metadata.get("severity") == "error" and event.data.get("agent_id") == handler:
+                future.set_exception(Exception(event.data.get("error", "Agent failed to process step")))
+        elif event.event_type == response_type:
+            future.set_result(event.data)
     
     def add_step(
         self,
@@ -167,6 +398,10 @@ class BaseWorkflow(ABC):
         **kwargs
     ):
         """Add a step to the workflow"""
+        # Without explicit dependencies a step runs after the previously added one
+        if kwargs.get("depends_on") is None and self.steps:
+            kwargs["depends_on"] = (self.steps[-1].step_id,)
+        
         step = WorkflowStep(
             step_id=step_id,
             name=name,
@@ -174,85 +409,140 @@ class BaseWorkflow(ABC):
             input_data=input_data or {},
             **kwargs
         )
+        step._on_change = self._mark_dirty
         self.steps.append(step)
     
+    def _mark_dirty(self):
+        """Invalidate the memoized to_dict() result"""
+        self._dirty = True
+    
     async def start(self, initial_context: Dict[str, Any] = None):
         """Start workflow execution"""
         if self.status != WorkflowStatus.PENDING:
             raise RuntimeError(f"Workflow {self.workflow_id} is not in pending state")
         
         self.status = WorkflowStatus.RUNNING
-        self.started_at = datetime.utcnow()
+        self._started = time.time()
         self.context.update(initial_context or {})
         
-        logger.info(f"🚀 Starting workflow {self.workflow_id} ({self.workflow_type})")
-        
-        # Emit workflow started event
-        await self._emit_workflow_event("started", {"initial_context": initial_context})
+        logger.info("🚀 Starting workflow %s (%s)", self.workflow_id, self.workflow_type)
         
-        # Start execution
-        await self._execute_next_step()
+        try:
+            # Emit workflow started event
+            self._emit_workflow_event("started", {"initial_context": initial_context})
+            
+            # Start execution
+            await self._run()
+        except Exception as e:
+            # Never leave a workflow that failed to run looking active
+            await self._fail_workflow(f"Workflow execution failed: {e}")
+            raise
     
-    async def _execute_next_step(self):
-        """Execute the next step in the workflow"""
-        if self.current_step_index >= len(self.steps):
+    async def _run(self):
+        """Drive the workflow, starting each step as soon as its own dependencies have finished"""
+        finished = set()
+        waiting = list(self.steps)
+        running = self._step_tasks
+        
+        try:
+            while self.status in (WorkflowStatus.RUNNING, WorkflowStatus.PAUSED):
+                # New steps only start while running; steps already in flight carry on when paused
+                if self.status == WorkflowStatus.RUNNING:
+                    ready = [step for step in waiting if all(dep in finished for dep in step.depends_on)]
+                    for step in ready:
+                        waiting.remove(step)
+                        running[asyncio.create_task(self._run_step(step))] = step
+                
+                if not running:
+                    # Block here while paused, even once every step has finished, so the
+                    # workflow only completes after resume(); cancel() also releases the wait
+                    if self.status == WorkflowStatus.PAUSED:
+                        await self._resume_event.wait()
+                        continue
+                    
+                    if not waiting:
+                        break
+                    
+                    await self._fail_workflow("Unresolvable step dependencies: " + ", ".join(step.step_id for step in waiting))
+                    return
+                
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    step = running.pop(task)
+                    if task.cancelled():
+                        # Only cancel() stops a step task while the workflow is running
+                        step.skip("Workflow cancelled before the step finished")
+                        continue
+                    task.result()
+                    finished.add(step.step_id)
+        finally:
+            # A required step failure (or cancellation) ends the workflow; stop steps still in flight
+            for task in running:
+                task.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+                for step in running.values():
+                    if step.status in (StepStatus.RUNNING, StepStatus.RETRYING):
+                        step.skip("Workflow ended before the step finished")
+                running.clear()
+        
+        if self.status == WorkflowStatus.RUNNING:
             await self._complete_workflow()
+    
+    async def _run_step(self, step: WorkflowStep):
+        """Run a single step to completion, retrying in place on failure"""
+        logger.info("▶️ Executing step %s: %s", step.step_id, step.name)
+        
+        # Start the step (agent dispatch events double as the started event)
+        step.start()
+        if not step.handler.endswith("-agent"):
+            self._emit_step_event(step, "started")
+            await self._flush_events()
+        
+        retrying = True
+        while retrying:
+            try:
+                await self._execute_step(step)
+                retrying = False
+            except Exception as e:
+                logger.error("❌ Step %s failed: %s", step.step_id, e)
+                retrying = await self._handle_step_failure(step, str(e))
+        
+        # Another step may have failed or the workflow been cancelled meanwhile
+        if self.status in (WorkflowStatus.FAILED, WorkflowStatus.CANCELLED):
             return
         
-        current_step = self.steps[self.current_step_index]
-        
-        try:
-            logger.info(f"▶️ Executing step {current_step.step_id}: {current_step.name}")
-            
-            # Start the step
-            current_step.start()
-            
-            # Emit step started event
-            await self._emit_step_event(current_step, "started")
-            
-            # Execute the step
-            await self._execute_step(current_step)
-            
-        except Exception as e:
-            logger.error(f"❌ Step {current_step.step_id} failed: {e}")
-            await self._handle_step_failure(current_step, str(e))
+        await self._step_completed(step)
     
     async def _execute_step(self, step: WorkflowStep):
         """Execute a specific step"""
         try:
-            # Prepare step input data
-            step_input = {
-                **step.input_data,
-                **self.context,
-                "workflow_id": self.workflow_id,
-                "step_id": step.step_id
-            }
+            # Layer step input over context without copying either;
+            # the event model materializes it once when dispatched
+            step_input = ChainMap(
+                {"workflow_id": self.workflow_id, "step_id": step.step_id},
+                self.context,
+                step.input_data
+            )
             
             # Execute step based on handler type
             if step.handler.endswith("-agent"):
                 await self._execute_agent_step(step, step_input)
             else:
-                await self._execute_function_step(step, step_input)
+                await asyncio.wait_for(
+                    self._execute_function_step(step, step_input),
+                    timeout=step.timeout_seconds
+                )
                 
         except asyncio.TimeoutError:
             raise Exception(f"Step timed out after {step.timeout_seconds} seconds")
         except Exception as e:
             raise Exception(f"Step execution failed: {e}")
     
-    async def _execute_agent_step(self, step: WorkflowStep, step_input: Dict[str, Any]):
+    async def _execute_agent_step(self, step: WorkflowStep, step_input: Mapping[str, Any]):
         """Execute a step handled by an agent"""
         # Create event for the agent to process
-        from src.core.events import BaseEvent, EventType
-        
-        # Map step handlers to event types
-        event_type_map = {
-            "scraper-agent": EventType.JOB_DISCOVERED,
-            "analyzer-agent": EventType.JOB_ANALYZED,
-            "generator-agent": EventType.RESUME_GENERATION_REQUESTED,
-            "optimizer-agent": EventType.RESUME_OPTIMIZATION_REQUESTED
-        }
-        
-        event_type = event_type_map.get(step.handler)
+        event_type = _AGENT_EVENT_TYPE.get(step.handler)
         if not event_type:
             raise Exception(f"Unknown agent handler: {step.handler}")
         
@@ -263,143 +553,183 @@ class BaseWorkflow(ABC):
             data=step_input,
             metadata={
                 "workflow_id": self.workflow_id,
-                "step_id": step.step_id
+                "step_id": step.step_id,
+                "step_name": step.name,
+                "step_started": True
             }
         )
         
-        success = await event_bus.publish(event)
-        if not success:
-            raise Exception("Failed to publish event to agent")
+        response_type = _AGENT_RESPONSE_TYPE.get(step.handler)
+        if response_type is None:
+            # Fire-and-forget agent; completing on dispatch matches the original behavior
+            self._pending_events.append(event)
+            if not await self._flush_events():
+                raise Exception("Failed to publish event to agent")
+            step.complete({"event_id": event.event_id})
+            return
+        
+        # Responses only arrive through the listener started with the engine
+        if BaseWorkflow._response_task is None:
+            raise Exception("Agent response listener is not running")
         
-        # Wait for step completion (simulated for now)
-        # In a real implementation, this would wait for response events
-        await asyncio.sleep(2)  # Simulate processing time
+        # Register before publishing so a fast response cannot be missed
+        future = asyncio.get_running_loop().create_future()
+        BaseWorkflow._pending[event.event_id] = (future, step.handler, response_type)
         
-        # Mark step as completed (agents will handle the actual work)
-        step.complete({"event_id": event.event_id})
+        try:
+            # Dispatch together with any queued workflow/step events
+            self._pending_events.append(event)
+            success = await self._flush_events()
+            if not success:
+                raise Exception("Failed to publish event to agent")
+            
+            # Wait for the agent's response event, bounded by the step timeout
+            result = await asyncio.wait_for(future, timeout=step.timeout_seconds)
+        except asyncio.TimeoutError:
+            raise Exception(f"Step timed out after {step.timeout_seconds} seconds")
+        finally:
+            BaseWorkflow._pending.pop(event.event_id, None)
+        
+        # Mark step as completed with the agent's output
+        step.complete({**(result or {}), "event_id": event.event_id})
     
-    async def _execute_function_step(self, step: WorkflowStep, step_input: Dict[str, Any]):
+    async def _execute_function_step(self, step: WorkflowStep, step_input: Mapping[str, Any]):
         """Execute a step handled by a function"""
         # This would call specific functions based on step.handler
         # For now, just simulate completion
         await asyncio.sleep(1)
         step.complete({"result": "function executed"})
     
-    async def _handle_step_failure(self, step: WorkflowStep, error_message: str):
-        """Handle step failure with retry logic"""
+    async def _handle_step_failure(self, step: WorkflowStep, error_message: str) -> bool:
+        """Handle step failure with retry logic, returning True if the step should be retried"""
         step.fail(error_message)
         
+        # A cancelled workflow must not dispatch the step again
+        if self.status == WorkflowStatus.CANCELLED:
+            return False
+        
         # Emit step failed event
-        await self._emit_step_event(step, "failed", {"error": error_message})
+        self._emit_step_event(step, "failed", {"error": error_message})
         
         # Check if we can retry
         if step.can_retry and step.required:
-            logger.info(f"🔄 Retrying step {step.step_id} (attempt {step.current_retry + 1})")
+            logger.info("🔄 Retrying step %s (attempt %d)", step.step_id, step.current_retry + 1)
             step.retry()
             
             # Wait before retry
             await asyncio.sleep(step.retry_delay)
-            
-            # Retry the step
-            await self._execute_step(step)
+            return True
+        
+        # Check if step is required
+        if step.required:
+            # Fail the entire workflow
+            await self._fail_workflow(f"Required step {step.step_id} failed: {error_message}")
         else:
-            # Check if step is required
-            if step.required:
-                # Fail the entire workflow
-                await self._fail_workflow(f"Required step {step.step_id} failed: {error_message}")
-            else:
-                # Skip and continue
-                logger.warning(f"⏭️ Skipping failed optional step {step.step_id}")
-                step.skip(f"Failed but optional: {error_message}")
-                await self._step_completed(step)
+            # Skip and continue
+            logger.warning("⏭️ Skipping failed optional step %s", step.step_id)
+            step.skip(f"Failed but optional: {error_message}")
+        return False
     
     async def _step_completed(self, step: WorkflowStep):
         """Handle step completion"""
-        logger.info(f"✅ Step {step.step_id} completed in {step.duration_seconds:.2f}s")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("✅ Step %s completed in %.2fs", step.step_id, step.duration_seconds)
         
         # Update context with step output
         self.context.update(step.output_data)
         
         # Emit step completed event
-        await self._emit_step_event(step, "completed", step.output_data)
+        self._emit_step_event(step, "completed", step.output_data)
+        await self._flush_events()
         
         # Move to next step
+        self._completed_count += 1
         self.current_step_index += 1
-        await self._execute_next_step()
+        self._dirty = True
     
     async def _complete_workflow(self):
         """Complete the workflow"""
         self.status = WorkflowStatus.COMPLETED
-        self.completed_at = datetime.utcnow()
+        self._completed = time.time()
+        self._done_event.set()
         
-        logger.info(f"🎉 Workflow {self.workflow_id} completed in {self.duration_seconds:.2f}s")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("🎉 Workflow %s completed in %.2fs", self.workflow_id, self.duration_seconds)
         
         # Emit workflow completed event
-        await self._emit_workflow_event("completed", {"final_context": self.context})
+        self._emit_workflow_event("completed", {"final_context": self.context})
+        await self._flush_events()
     
     async def _fail_workflow(self, error_message: str):
         """Fail the workflow"""
+        # Concurrent steps may each try to fail the workflow
+        if self.status in (WorkflowStatus.FAILED, WorkflowStatus.CANCELLED):
+            return
+        
         self.status = WorkflowStatus.FAILED
-        self.completed_at = datetime.utcnow()
+        self._completed = time.time()
         self.error_message = error_message
+        self._done_event.set()
         
-        logger.error(f"💥 Workflow {self.workflow_id} failed: {error_message}")
+        logger.error("💥 Workflow %s failed: %s", self.workflow_id, error_message)
         
         # Emit workflow failed event
-        await self._emit_workflow_event("failed", {"error": error_message})
+        self._emit_workflow_event("failed", {"error": error_message})
+        await self._flush_events()
     
     async def cancel(self, reason: str = ""):
         """Cancel the workflow"""
         self.status = WorkflowStatus.CANCELLED
-        self.completed_at = datetime.utcnow()
+        self._completed = time.time()
         self.error_message = reason
+        self._done_event.set()
+        
+        # Stop steps in flight (no more retries or agent dispatches) and release a paused run loop
+        for task in self._step_tasks:
+            task.cancel()
+        self._resume_event.set()
         
-        logger.info(f"🛑 Workflow {self.workflow_id} cancelled: {reason}")
+        logger.info("🛑 Workflow %s cancelled: %s", self.workflow_id, reason)
         
         # Emit workflow cancelled event
-        await self._emit_workflow_event("cancelled", {"reason": reason})
+        self._emit_workflow_event("cancelled", {"reason": reason})
+        await self._flush_events()
     
     async def pause(self):
         """Pause the workflow"""
         if self.status == WorkflowStatus.RUNNING:
             self.status = WorkflowStatus.PAUSED
-            logger.info(f"⏸️ Workflow {self.workflow_id} paused")
+            self._resume_event.clear()
+            logger.info("⏸️ Workflow %s paused", self.workflow_id)
     
     async def resume(self):
         """Resume the workflow"""
         if self.status == WorkflowStatus.PAUSED:
             self.status = WorkflowStatus.RUNNING
-            logger.info(f"▶️ Workflow {self.workflow_id} resumed")
-            await self._execute_next_step()
-    
-    async def _emit_workflow_event(self, event_name: str, data: Dict[str, Any] = None):
-        """Emit workflow-level events"""
-        from src.core.events import BaseEvent, EventType
-        
-        event_type_map = {
-            "started": EventType.WORKFLOW_STARTED,
-            "completed": EventType.WORKFLOW_COMPLETED,
-            "failed": EventType.WORKFLOW_FAILED,
-            "cancelled": EventType.WORKFLOW_FAILED  # Use same type with different data
-        }
-        
+            self._resume_event.set()
+            logger.info("▶️ Workflow %s resumed", self.workflow_id)
+    
+    async def wait_done(self):
+        """Wait until the workflow completes, fails or is cancelled"""
+        await self._done_event.wait()
+    
+    def _emit_workflow_event(self, event_name: str, data: Dict[str, Any] = None):
+        """Queue a workflow-level event for the next flush"""
         event = BaseEvent(
-            event_type=event_type_map.get(event_name, EventType.WORKFLOW_STARTED),
+            event_type=_WORKFLOW_EVENT_TYPE.get(event_name, EventType.WORKFLOW_STARTED),
             user_id=self.user_id,
             data={
                 "workflow_id": self.workflow_id,
                 "workflow_type": self.workflow_type,
-                "status": self.status.value,
+                "status": self._status_str,
                 **(data or {})
             }
         )
         
-        await event_bus.publish(event)
+        self._pending_events.append(event)
     
-    async def _emit_step_event(self, step: WorkflowStep, event_name: str, data: Dict[str, Any] = None):
-        """Emit step-level events"""
-        from src.core.events import BaseEvent, EventType
-        
+    def _emit_step_event(self, step: WorkflowStep, event_name: str, data: Dict[str, Any] = None):
+        """Queue a step-level event for the next flush"""
         event = BaseEvent(
             event_type=EventType.WORKFLOW_STEP_COMPLETED,
             user_id=self.user_id,
@@ -407,46 +737,73 @@ class BaseWorkflow(ABC):
                 "workflow_id": self.workflow_id,
                 "step_id": step.step_id,
                 "step_name": step.name,
-                "step_status": step.status.value,
+                "step_status": step._status_str,
                 "event_name": event_name,
                 **(data or {})
             }
         )
         
-        await event_bus.publish(event)
+        self._pending_events.append(event)
+    
+    async def _flush_events(self) -> bool:
+        """Publish all queued workflow and step events in a single batch"""
+        if not self._pending_events:
+            return True
+        
+        events, self._pending_events = self._pending_events, []
+        return await event_bus.publish_many(events)
+    
+    @property
+    def created_at(self) -> datetime:
+        return _to_datetime(self._created)
+    
+    @property
+    def created_timestamp(self) -> float:
+        """Creation time as a Unix timestamp (cheap sort key)"""
+        return self._created
+    
+    @property
+    def started_at(self) -> Optional[datetime]:
+        return _to_datetime(self._started)
+    
+    @property
+    def completed_at(self) -> Optional[datetime]:
+        return _to_datetime(self._completed)
     
     @property
     def duration_seconds(self) -> Optional[float]:
         """Calculate workflow duration"""
-        if self.started_at and self.completed_at:
-            return (self.completed_at - self.started_at).total_seconds()
+        if self._started is not None and self._completed is not None:
+            return self._completed - self._started
         return None
     
     @property
     def progress_percentage(self) -> float:
         """Calculate workflow progress percentage"""
-        if not self.steps:
-            return 0.0
-        
-        completed_steps = sum(1 for step in self.steps if step.status == StepStatus.COMPLETED)
-        return (completed_steps / len(self.steps)) * 100
+        return (self._completed_count / len(self.steps)) * 100 if self.steps else 0.0
     
     def get_current_step(self) -> Optional[WorkflowStep]:
-        """Get the current step being executed"""
-        if 0 <= self.current_step_index < len(self.steps):
-            return self.steps[self.current_step_index]
+        """Get the first step that has not finished yet"""
+        for step in self.steps:
+            if step.status not in (StepStatus.COMPLETED, StepStatus.SKIPPED):
+                return step
         return None
     
     def to_dict(self) -> Dict[str, Any]:
-        """Convert workflow to dictionary"""
-        return {
-            "workflow_id": self.workflow_id,
-            "workflow_type": self.workflow_type,
-            "user_id": self.user_id,
-            "status": self.status.value,
-            "created_at": self.created_at.isoformat(),
-            "started_at": self.started_at.isoformat() if self.started_at else None,
-            "completed_at": self.completed_at.isoformat() if self.completed_at else None,
+        """
+        Convert workflow to dictionary
+        
+        The result is memoized until the workflow or one of its steps changes
+        state, so callers must treat it as read-only.
+        """
+        if not self._dirty and self._dict_cache is not None:
+            return self._dict_cache
+        
+        self._dict_cache = {
+            **self._static_dict,
+            "status": self._status_str,
+            "started_at": _iso(self._started),
+            "completed_at": _iso(self._completed),
             "duration_seconds": self.duration_seconds,
             "progress_percentage": self.progress_percentage,
             "current_step_index": self.current_step_index,
@@ -454,4 +811,6 @@ class BaseWorkflow(ABC):
             "context": self.context,
             "error_message": self.error_message,
             "steps": [step.to_dict() for step in self.steps]
-        }
\ No newline at end of file
+        }
+        self._dirty = False
+        return self._dict_cache
\ No newline at end of file
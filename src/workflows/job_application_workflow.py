@@ -1,5 +1,6 @@
 # src/workflows/job_application_workflow.py
 import logging
+from types import MappingProxyType
 from typing import Dict, Any
 
 from src.workflows.base_workflow import BaseWorkflow
@@ -21,93 +22,95 @@ class JobApplicationWorkflow(BaseWorkflow):
     6. Follow-up Tracking - Track application status (future)
     """
     
+    __slots__ = ()
+    
     @property
     def workflow_type(self) -> str:
         return "job_application"
     
-    def _initialize_steps(self):
-        """Initialize the job application workflow steps"""
-        
+    _STEP_TEMPLATES = (
         # Step 1: Job Discovery
-        self.add_step(
+        dict(
             step_id="discover_jobs",
             name="Discover Relevant Jobs",
             handler="scraper-agent",
-            input_data={
-                "search_terms": [],  # Will be populated from context
+            input_data=MappingProxyType({
+                "search_terms": (),  # Will be populated from context
                 "location": "Remote",
                 "max_jobs": 10
-            },
+            }),
             timeout_seconds=120,
             retry_count=2,
             required=True
-        )
-        
+        ),
+
         # Step 2: Job Analysis  
-        self.add_step(
+        dict(
             step_id="analyze_jobs",
             name="Analyze Job Requirements",
             handler="analyzer-agent",
-            input_data={},
+            input_data=MappingProxyType({}),
             timeout_seconds=300,
             retry_count=3,
             required=True
-        )
-        
+        ),
+
         # Step 3: Resume Generation
-        self.add_step(
+        dict(
             step_id="generate_resumes",
             name="Generate Customized Resumes",
             handler="generator-agent",
-            input_data={
+            input_data=MappingProxyType({
                 "template": "modern_professional",
                 "generate_multiple_versions": True
-            },
+            }),
             timeout_seconds=180,
             retry_count=2,
             required=True
-        )
-        
+        ),
+
         # Step 4: Resume Optimization
-        self.add_step(
+        dict(
             step_id="optimize_resumes",
             name="Optimize Resume Content",
             handler="optimizer-agent",
-            input_data={
+            input_data=MappingProxyType({
                 "optimization_type": "ats_optimization"
-            },
+            }),
             timeout_seconds=120,
             retry_count=1,
             required=False  # Optional optimization
-        )
-        
+        ),
+
         # Step 5: Application Submission (Future)
-        self.add_step(
+        dict(
             step_id="submit_applications",
             name="Submit Job Applications",
             handler="submission-agent",  # Future agent
-            input_data={
+            input_data=MappingProxyType({
                 "auto_submit": False,  # Manual approval required
                 "submission_delay": 300  # 5 minute delay between submissions
-            },
+            }),
             timeout_seconds=600,
             retry_count=1,
             required=False  # Optional for now
-        )
-        
+        ),
+
         # Step 6: Setup Tracking (Future)
-        self.add_step(
+        dict(
             step_id="setup_tracking",
             name="Setup Application Tracking",
             handler="tracking-agent",  # Future agent
-            input_data={
+            input_data=MappingProxyType({
                 "follow_up_schedule": "weekly",
                 "status_check_interval": 3  # days
-            },
+            }),
             timeout_seconds=60,
             retry_count=1,
-            required=False
-        )
+            required=False,
+            depends_on=("analyze_jobs",)  # Only needs analyzed jobs; runs alongside resume steps
+        ),
+    )
 
 
 class QuickResumeWorkflow(BaseWorkflow):
@@ -116,49 +119,50 @@ class QuickResumeWorkflow(BaseWorkflow):
     Skips job discovery and focuses on resume customization
     """
     
+    __slots__ = ()
+    
     @property
     def workflow_type(self) -> str:
         return "quick_resume"
     
-    def _initialize_steps(self):
-        """Initialize the quick resume workflow steps"""
-        
+    _STEP_TEMPLATES = (
         # Step 1: Job Analysis (for provided job)
-        self.add_step(
+        dict(
             step_id="analyze_job",
             name="Analyze Job Requirements",
             handler="analyzer-agent",
-            input_data={},
+            input_data=MappingProxyType({}),
             timeout_seconds=180,
             retry_count=2,
             required=True
-        )
-        
+        ),
+
         # Step 2: Resume Generation
-        self.add_step(
+        dict(
             step_id="generate_resume",
             name="Generate Customized Resume",
             handler="generator-agent",
-            input_data={
+            input_data=MappingProxyType({
                 "template": "modern_professional"
-            },
+            }),
             timeout_seconds=120,
             retry_count=2,
             required=True
-        )
-        
+        ),
+
         # Step 3: Resume Optimization
-        self.add_step(
+        dict(
             step_id="optimize_resume",
             name="Optimize Resume Content",
             handler="optimizer-agent",
-            input_data={
+            input_data=MappingProxyType({
                 "optimization_type": "job_specific"
-            },
+            }),
             timeout_seconds=90,
             retry_count=1,
             required=False
-        )
+        ),
+    )
 
 
 class BulkApplicationWorkflow(BaseWorkflow):
@@ -167,86 +171,87 @@ class BulkApplicationWorkflow(BaseWorkflow):
     Optimized for high-volume applications with rate limiting
     """
     
+    __slots__ = ()
+    
     @property
     def workflow_type(self) -> str:
         return "bulk_application"
     
-    def _initialize_steps(self):
-        """Initialize the bulk application workflow steps"""
-        
+    _STEP_TEMPLATES = (
         # Step 1: Bulk Job Discovery
-        self.add_step(
+        dict(
             step_id="bulk_discover_jobs",
             name="Bulk Job Discovery",
             handler="scraper-agent",
-            input_data={
-                "search_terms": [],
+            input_data=MappingProxyType({
+                "search_terms": (),
                 "location": "Remote",
                 "max_jobs": 50,  # Higher limit for bulk
-                "job_boards": ["linkedin", "indeed", "glassdoor"]
-            },
+                "job_boards": ("linkedin", "indeed", "glassdoor")
+            }),
             timeout_seconds=600,  # Longer timeout for bulk
             retry_count=2,
             required=True
-        )
-        
+        ),
+
         # Step 2: Batch Job Analysis
-        self.add_step(
+        dict(
             step_id="batch_analyze_jobs",
             name="Batch Analyze Jobs",
             handler="analyzer-agent",
-            input_data={
+            input_data=MappingProxyType({
                 "batch_mode": True,
                 "parallel_processing": True
-            },
+            }),
             timeout_seconds=900,
             retry_count=1,
             required=True
-        )
-        
+        ),
+
         # Step 3: Smart Resume Generation
-        self.add_step(
+        dict(
             step_id="smart_generate_resumes",
             name="Smart Resume Generation",
             handler="generator-agent",
-            input_data={
+            input_data=MappingProxyType({
                 "template_selection": "auto",  # Auto-select templates
                 "reuse_similar": True,  # Reuse resumes for similar jobs
                 "batch_mode": True
-            },
+            }),
             timeout_seconds=1200,
             retry_count=1,
             required=True
-        )
-        
+        ),
+
         # Step 4: Bulk Optimization
-        self.add_step(
+        dict(
             step_id="bulk_optimize",
             name="Bulk Resume Optimization",
             handler="optimizer-agent",
-            input_data={
+            input_data=MappingProxyType({
                 "optimization_type": "bulk_ats",
                 "prioritize_high_match": True
-            },
+            }),
             timeout_seconds=600,
             retry_count=1,
             required=False
-        )
-        
+        ),
+
         # Step 5: Staged Submission
-        self.add_step(
+        dict(
             step_id="staged_submission",
             name="Staged Application Submission",
             handler="submission-agent",
-            input_data={
+            input_data=MappingProxyType({
                 "submission_strategy": "staged",  # Submit in batches
                 "daily_limit": 20,
                 "submission_spacing": 900  # 15 minutes between submissions
-            },
+            }),
             timeout_seconds=3600,  # 1 hour for staged submission
             retry_count=1,
             required=False
-        )
+        ),
+    )
 
 
 class OptimizationWorkflow(BaseWorkflow):
@@ -255,68 +260,80 @@ class OptimizationWorkflow(BaseWorkflow):
     Based on performance data and success patterns
     """
     
+    __slots__ = ()
+    
     @property
     def workflow_type(self) -> str:
         return "optimization"
     
-    def _initialize_steps(self):
-        """Initialize the optimization workflow steps"""
-        
+    _STEP_TEMPLATES = (
         # Step 1: Performance Analysis
-        self.add_step(
+        dict(
             step_id="analyze_performance",
             name="Analyze Resume Performance",
             handler="optimizer-agent",
-            input_data={
+            input_data=MappingProxyType({
                 "analysis_type": "performance_review",
                 "include_benchmarks": True
-            },
+            }),
             timeout_seconds=180,
             retry_count=1,
             required=True
-        )
-        
+        ),
+
         # Step 2: Pattern Recognition
-        self.add_step(
+        dict(
             step_id="identify_patterns",
             name="Identify Success Patterns",
             handler="optimizer-agent",
-            input_data={
+            input_data=MappingProxyType({
                 "analysis_type": "pattern_recognition",
                 "cross_user_patterns": True
-            },
+            }),
             timeout_seconds=120,
             retry_count=1,
-            required=False
-        )
-        
+            required=False,
+            depends_on=()  # Independent of performance analysis
+        ),
+
         # Step 3: Generate Recommendations
-        self.add_step(
+        dict(
             step_id="generate_recommendations",
             name="Generate Optimization Recommendations",
             handler="optimizer-agent",
-            input_data={
+            input_data=MappingProxyType({
                 "recommendation_type": "comprehensive",
                 "include_examples": True
-            },
+            }),
             timeout_seconds=300,
             retry_count=2,
-            required=True
-        )
-        
+            required=True,
+            depends_on=("analyze_performance", "identify_patterns")
+        ),
+
         # Step 4: Apply Improvements (Optional)
-        self.add_step(
+        dict(
             step_id="apply_improvements",
             name="Apply Recommended Improvements",
             handler="generator-agent",
-            input_data={
+            input_data=MappingProxyType({
                 "improvement_mode": True,
                 "preserve_original": True
-            },
+            }),
             timeout_seconds=180,
             retry_count=1,
             required=False
-        )
+        ),
+    )
+
+
+# Workflow classes by type, used by the factory below
+_WORKFLOW_CLASSES = {
+    "job_application": JobApplicationWorkflow,
+    "quick_resume": QuickResumeWorkflow,
+    "bulk_application": BulkApplicationWorkflow,
+    "optimization": OptimizationWorkflow
+}
 
 
 # Workflow factory for creating workflows based on type
@@ -332,17 +349,10 @@ def create_workflow(workflow_type: str, user_id: int, **kwargs) -> BaseWorkflow:
     Returns:
         BaseWorkflow: The created workflow instance
     """
-    workflow_classes = {
-        "job_application": JobApplicationWorkflow,
-        "quick_resume": QuickResumeWorkflow,
-        "bulk_application": BulkApplicationWorkflow,
-        "optimization": OptimizationWorkflow
-    }
-    
-    if workflow_type not in workflow_classes:
+    workflow_class = _WORKFLOW_CLASSES.get(workflow_type)
+    if workflow_class is None:
         raise ValueError(f"Unknown workflow type: {workflow_type}")
     
-    workflow_class = workflow_classes[workflow_type]
     return workflow_class(user_id=user_id, **kwargs)
 
 
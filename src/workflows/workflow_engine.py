@@ -1,9 +1,10 @@
 # src/workflows/workflow_engine.py
 import asyncio
+import heapq
 import logging
-from typing import Dict, List, Optional, Any
-from datetime import datetime, timedelta
-import json
+from itertools import chain, islice
+from collections import Counter, defaultdict, deque
+from typing import Deque, Dict, List, Optional, Any, Set, Tuple
 
 from src.workflows.base_workflow import BaseWorkflow, WorkflowStatus
 from src.workflows.job_application_workflow import create_workflow, WORKFLOW_TEMPLATES
@@ -30,7 +31,17 @@ class WorkflowEngine:
         self.cell_id = cell_id
         self.active_workflows: Dict[str, BaseWorkflow] = {}
         self.completed_workflows: Dict[str, BaseWorkflow] = {}
-        self.workflow_history: List[Dict[str, Any]] = []
+        self.max_history_entries = 10_000  # Oldest history entries are dropped past this
+        self.workflow_history: Deque[Dict[str, Any]] = deque(maxlen=self.max_history_entries)
+        
+        # Secondary indices of workflow IDs for filtered listing
+        self._by_user: Dict[int, Set[str]] = defaultdict(set)
+        self._by_status: Dict[WorkflowStatus, Set[str]] = defaultdict(set)
+        self._by_type: Dict[str, Set[str]] = defaultdict(set)
+        
+        # Per-user statistics, recomputed only when that user's version changes
+        self._user_version: Dict[int, int] = defaultdict(int)
+        self._user_stats_cache: Dict[int, Tuple[int, Dict[str, Any]]] = {}
         
         # Engine statistics
         self.workflows_created = 0
@@ -38,13 +49,26 @@ class WorkflowEngine:
         self.workflows_failed = 0
         self.total_execution_time = 0.0
         
+        # Strong references to monitor tasks; asyncio only keeps weak ones
+        self._monitor_tasks: Set[asyncio.Task] = set()
+        
         # Monitoring and cleanup
         self.max_completed_workflows = 100  # Keep last 100 completed workflows
         self.cleanup_interval = 3600  # Cleanup every hour
-        self.last_cleanup = datetime.utcnow()
+        self._cleanup_task: Optional[asyncio.Task] = None
+        
+        # Workflow event handlers by event type
+        self._event_handlers = {
+            EventType.WORKFLOW_STEP_COMPLETED: self._handle_step_completed
+        }
         
         logger.info(f"🏭 Workflow Engine initialized for cell {self.cell_id}")
     
+    async def start(self):
+        """Start the agent response listener; call once at application startup"""
+        await BaseWorkflow.start_response_listener()
+        logger.info(f"✅ Workflow Engine started for cell {self.cell_id}")
+    
     async def create_workflow(
         self, 
         workflow_type: str, 
@@ -76,6 +100,17 @@ class WorkflowEngine:
             self.active_workflows[workflow.workflow_id] = workflow
             self.workflows_created += 1
             
+            # Index the workflow and keep its status index current
+            self._by_user[user_id].add(workflow.workflow_id)
+            self._by_type[workflow.workflow_type].add(workflow.workflow_id)
+            self._by_status[workflow.status].add(workflow.workflow_id)
+            workflow.status_listener = self._on_status_change
+            self._user_version[user_id] += 1
+            
+            # Periodic cleanup starts with the first workflow
+            if self._cleanup_task is None:
+                self._cleanup_task = asyncio.create_task(self._cleanup_loop())
+            
             # Update initial context if provided
             if initial_context:
                 workflow.context.update(initial_context)
@@ -99,8 +134,8 @@ class WorkflowEngine:
         Returns:
             bool: True if started successfully
         """
+        workflow = self.active_workflows.get(workflow_id)
         try:
-            workflow = self.active_workflows.get(workflow_id)
             if not workflow:
                 logger.error(f"❌ Workflow {workflow_id} not found")
                 return False
@@ -111,12 +146,17 @@ class WorkflowEngine:
             await workflow.start(initial_context or {})
             
             # Setup monitoring
-            asyncio.create_task(self._monitor_workflow(workflow))
+            task = asyncio.create_task(self._monitor_workflow(workflow))
+            self._monitor_tasks.add(task)
+            task.add_done_callback(self._monitor_tasks.discard)
             
             return True
             
         except Exception as e:
             logger.error(f"❌ Failed to start workflow {workflow_id}: {e}")
+            # A workflow that failed while running has been marked failed; retire it
+            if workflow is not None and workflow.status in (WorkflowStatus.FAILED, WorkflowStatus.COMPLETED, WorkflowStatus.CANCELLED):
+                await self._move_to_completed(workflow)
             return False
     
     async def create_and_start_workflow(
@@ -168,14 +208,45 @@ class WorkflowEngine:
             return True
         return False
     
-    async def get_workflow_status(self, workflow_id: str) -> Optional[Dict[str, Any]]:
-        """Get workflow status and details"""
+    def _on_status_change(self, workflow: BaseWorkflow, previous: Optional[WorkflowStatus]):
+        """Move a workflow between status index buckets"""
+        if previous is not None:
+            self._by_status[previous].discard(workflow.workflow_id)
+        self._by_status[workflow.status].add(workflow.workflow_id)
+        self._user_version[workflow.user_id] += 1
+    
+    def _unindex_workflow(self, workflow: BaseWorkflow):
+        """Remove a workflow from all secondary indices"""
+        workflow.status_listener = None
+        self._user_version[workflow.user_id] += 1
+        for index, key in (
+            (self._by_user, workflow.user_id),
+            (self._by_status, workflow.status),
+            (self._by_type, workflow.workflow_type)
+        ):
+            ids = index.get(key)
+            if ids is not None:
+                ids.discard(workflow.workflow_id)
+                if not ids:
+                    del index[key]
+        
+        # Forget statistics for users with no remaining workflows
+        if workflow.user_id not in self._by_user:
+            self._user_version.pop(workflow.user_id, None)
+            self._user_stats_cache.pop(workflow.user_id, None)
+    
+    def _get_workflow(self, workflow_id: str) -> Optional[BaseWorkflow]:
+        """Look up an active or completed workflow by ID"""
         # Check active workflows first
         workflow = self.active_workflows.get(workflow_id)
         if not workflow:
             # Check completed workflows
             workflow = self.completed_workflows.get(workflow_id)
-        
+        return workflow
+    
+    async def get_workflow_status(self, workflow_id: str) -> Optional[Dict[str, Any]]:
+        """Get workflow status and details"""
+        workflow = self._get_workflow(workflow_id)
         if workflow:
             return workflow.to_dict()
         return None
@@ -184,7 +255,8 @@ class WorkflowEngine:
         self, 
         user_id: Optional[int] = None, 
         status: Optional[WorkflowStatus] = None,
-        workflow_type: Optional[str] = None
+        workflow_type: Optional[str] = None,
+        limit: Optional[int] = None
     ) -> List[Dict[str, Any]]:
         """
         List workflows with optional filtering
@@ -193,61 +265,91 @@ class WorkflowEngine:
             user_id: Filter by user ID
             status: Filter by workflow status
             workflow_type: Filter by workflow type
+            limit: Return only the newest N workflows
             
         Returns:
             List of workflow dictionaries
         """
-        workflows = []
-        
-        # Combine active and completed workflows
-        all_workflows = {**self.active_workflows, **self.completed_workflows}
+        # Collect the index buckets for each active filter
+        filters = []
+        if user_id:
+            filters.append(self._by_user.get(user_id, set()))
+        if status:
+            filters.append(self._by_status.get(status, set()))
+        if workflow_type:
+            filters.append(self._by_type.get(workflow_type, set()))
         
-        for workflow in all_workflows.values():
-            # Apply filters
-            if user_id and workflow.user_id != user_id:
-                continue
-            if status and workflow.status != status:
-                continue
-            if workflow_type and workflow.workflow_type != workflow_type:
-                continue
-            
-            workflows.append(workflow.to_dict())
+        if filters:
+            # Intersect starting from the smallest bucket
+            filters.sort(key=len)
+            workflow_ids = filters[0].intersection(*filters[1:])
+            workflows = [self._get_workflow(wid) for wid in workflow_ids]
+        else:
+            # Chain active and completed workflows without building a merged dict
+            workflows = list(chain(self.active_workflows.values(), self.completed_workflows.values()))
         
         # Sort by creation time (newest first)
-        workflows.sort(key=lambda w: w['created_at'], reverse=True)
+        if limit is not None:
+            workflows = heapq.nlargest(limit, workflows, key=lambda w: w.created_timestamp)
+        else:
+            workflows.sort(key=lambda w: w.created_timestamp, reverse=True)
         
-        return workflows
+        return [workflow.to_dict() for workflow in workflows]
+    
+    def _iter_user_workflows(self, user_id: int):
+        """Iterate over a user's active and completed workflows via the user index"""
+        return (self._get_workflow(wid) for wid in self._by_user.get(user_id, ()))
     
     async def get_user_workflows(self, user_id: int) -> Dict[str, Any]:
         """Get comprehensive workflow information for a user"""
-        user_workflows = await self.list_workflows(user_id=user_id)
-        
-        # Calculate statistics
-        total = len(user_workflows)
-        running = len([w for w in user_workflows if w['status'] == 'running'])
-        completed = len([w for w in user_workflows if w['status'] == 'completed'])
-        failed = len([w for w in user_workflows if w['status'] == 'failed'])
+        version = self._user_version.get(user_id, 0)
+        cached = self._user_stats_cache.get(user_id)
+        if cached is not None and cached[0] == version:
+            stats = cached[1]
+        else:
+            # Calculate statistics in a single pass over the workflow objects
+            total = running = completed = failed = duration_count = 0
+            duration_sum = 0.0
+            for workflow in self._iter_user_workflows(user_id):
+                total += 1
+                status = workflow.status
+                if status is WorkflowStatus.RUNNING:
+                    running += 1
+                elif status is WorkflowStatus.COMPLETED:
+                    completed += 1
+                elif status is WorkflowStatus.FAILED:
+                    failed += 1
+                
+                # Average duration covers workflows that have finished
+                duration = workflow.duration_seconds
+                if duration:
+                    duration_sum += duration
+                    duration_count += 1
+            avg_duration = duration_sum / duration_count if duration_count else 0
+            
+            stats = {
+                "user_id": user_id,
+                "total_workflows": total,
+                "running_workflows": running,
+                "completed_workflows": completed,
+                "failed_workflows": failed,
+                "average_duration_seconds": avg_duration
+            }
+            self._user_stats_cache[user_id] = (version, stats)
         
-        # Calculate average duration for completed workflows
-        completed_workflows = [w for w in user_workflows if w['duration_seconds']]
-        avg_duration = sum(w['duration_seconds'] for w in completed_workflows) / len(completed_workflows) if completed_workflows else 0
+        # Only the newest workflows are serialized
+        recent = heapq.nlargest(10, self._iter_user_workflows(user_id), key=lambda w: w.created_timestamp)
         
         return {
-            "user_id": user_id,
-            "total_workflows": total,
-            "running_workflows": running,
-            "completed_workflows": completed,
-            "failed_workflows": failed,
-            "average_duration_seconds": avg_duration,
-            "workflows": user_workflows[:10]  # Return last 10 workflows
+            **stats,
+            "workflows": [workflow.to_dict() for workflow in recent]  # Return last 10 workflows
         }
     
     async def _monitor_workflow(self, workflow: BaseWorkflow):
         """Monitor a workflow for completion"""
         try:
-            # Wait for workflow to complete
-            while workflow.status in [WorkflowStatus.RUNNING, WorkflowStatus.PAUSED]:
-                await asyncio.sleep(5)  # Check every 5 seconds
+            # Wait for the workflow to signal a terminal state
+            await workflow.wait_done()
             
             # Move completed/failed workflow to completed list
             await self._move_to_completed(workflow)
@@ -257,8 +359,10 @@ class WorkflowEngine:
     
     async def _move_to_completed(self, workflow: BaseWorkflow):
         """Move workflow from active to completed"""
-        if workflow.workflow_id in self.active_workflows:
-            del self.active_workflows[workflow.workflow_id]
+        # Cancellation moves the workflow directly; the monitor then finds it gone
+        if workflow.workflow_id not in self.active_workflows:
+            return
+        del self.active_workflows[workflow.workflow_id]
         
         self.completed_workflows[workflow.workflow_id] = workflow
         
@@ -268,51 +372,52 @@ class WorkflowEngine:
         elif workflow.status == WorkflowStatus.FAILED:
             self.workflows_failed += 1
         
-        # Add to history
+        # Add to history, reusing the serialized (memoized) workflow fields
+        snapshot = workflow.to_dict()
         self.workflow_history.append({
-            "workflow_id": workflow.workflow_id,
-            "workflow_type": workflow.workflow_type,
-            "user_id": workflow.user_id,
-            "status": workflow.status.value,
-            "duration_seconds": workflow.duration_seconds,
-            "completed_at": workflow.completed_at.isoformat() if workflow.completed_at else None
+            "workflow_id": snapshot["workflow_id"],
+            "workflow_type": snapshot["workflow_type"],
+            "user_id": snapshot["user_id"],
+            "status": snapshot["status"],
+            "duration_seconds": snapshot["duration_seconds"],
+            "completed_at": snapshot["completed_at"]
         })
         
-        # Cleanup if needed
-        await self._cleanup_completed_workflows()
-        
         logger.info(f"📁 Moved workflow {workflow.workflow_id} to completed (status: {workflow.status.value})")
     
-    async def _cleanup_completed_workflows(self):
-        """Cleanup old completed workflows"""
-        current_time = datetime.utcnow()
+    async def shutdown(self):
+        """Stop the engine's background tasks and the agent response listener"""
+        tasks = list(self._monitor_tasks)
+        if self._cleanup_task is not None:
+            tasks.append(self._cleanup_task)
+            self._cleanup_task = None
         
-        # Check if cleanup is needed
-        if (current_time - self.last_cleanup).seconds < self.cleanup_interval:
-            return
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
         
+        await BaseWorkflow.stop_response_listener()
+        logger.info(f"👋 Workflow Engine stopped for cell {self.cell_id}")
+    
+    async def _cleanup_loop(self):
+        """Periodically trim completed workflows"""
+        while True:
+            await asyncio.sleep(self.cleanup_interval)
+            try:
+                await self._cleanup_completed_workflows()
+            except Exception as e:
+                logger.error(f"❌ Workflow cleanup failed: {e}")
+    
+    async def _cleanup_completed_workflows(self):
+        """Cleanup old completed workflows"""
         # Remove excess completed workflows
-        if len(self.completed_workflows) > self.max_completed_workflows:
-            # Sort by completion time and keep most recent
-            workflows_by_completion = sorted(
-                self.completed_workflows.values(),
-                key=lambda w: w.completed_at or datetime.min,
-                reverse=True
-            )
-            
-            # Keep only the most recent workflows
-            workflows_to_keep = workflows_by_completion[:self.max_completed_workflows]
-            keep_ids = {w.workflow_id for w in workflows_to_keep}
+        excess = len(self.completed_workflows) - self.max_completed_workflows
+        if excess > 0:
+            # Workflows are inserted as they finish, so the oldest come first
+            for wid in list(islice(self.completed_workflows, excess)):
+                self._unindex_workflow(self.completed_workflows.pop(wid))
             
-            # Remove old workflows
-            self.completed_workflows = {
-                wid: workflow for wid, workflow in self.completed_workflows.items()
-                if wid in keep_ids
-            }
-            
-            logger.info(f"🧹 Cleaned up old workflows, kept {len(workflows_to_keep)} most recent")
-        
-        self.last_cleanup = current_time
+            logger.info(f"🧹 Cleaned up {excess} old workflows, kept {len(self.completed_workflows)} most recent")
     
     def get_engine_stats(self) -> Dict[str, Any]:
         """Get workflow engine statistics"""
@@ -324,10 +429,7 @@ class WorkflowEngine:
         success_rate = (self.workflows_completed / total_finished * 100) if total_finished > 0 else 0
         
         # Active workflow breakdown by status
-        status_breakdown = {}
-        for workflow in self.active_workflows.values():
-            status = workflow.status.value
-            status_breakdown[status] = status_breakdown.get(status, 0) + 1
+        status_breakdown = Counter(w.status.value for w in self.active_workflows.values())
         
         return {
             "cell_id": self.cell_id,
@@ -338,7 +440,7 @@ class WorkflowEngine:
             "total_failed": self.workflows_failed,
             "success_rate_percentage": round(success_rate, 2),
             "average_execution_time": self.total_execution_time / self.workflows_completed if self.workflows_completed > 0 else 0,
-            "active_status_breakdown": status_breakdown,
+            "active_status_breakdown": dict(status_breakdown),
             "workflow_templates": list(WORKFLOW_TEMPLATES.keys())
         }
     
@@ -348,27 +450,29 @@ class WorkflowEngine:
     
     async def handle_workflow_event(self, event: BaseEvent):
         """Handle workflow-related events from the event bus"""
+        # Most events on the bus are not for an active workflow of this engine
+        workflow_id = event.data.get("workflow_id")
+        if not workflow_id or workflow_id not in self.active_workflows:
+            return
+        
+        handler = self._event_handlers.get(event.event_type)
+        if handler is None:
+            return
+        
         try:
-            workflow_id = event.data.get("workflow_id")
-            if not workflow_id:
-                return
-            
-            workflow = self.active_workflows.get(workflow_id)
-            if not workflow:
-                return
-            
-            if event.event_type == EventType.WORKFLOW_STEP_COMPLETED:
-                # Handle step completion
-                step_id = event.data.get("step_id")
-                step_status = event.data.get("step_status")
-                
-                logger.debug(f"🔄 Workflow {workflow_id} step {step_id} status: {step_status}")
-                
-                # Update workflow state based on step completion
-                # This would trigger the next step in the workflow
-                
+            await handler(event, self.active_workflows[workflow_id])
         except Exception as e:
             logger.error(f"❌ Error handling workflow event: {e}")
+    
+    async def _handle_step_completed(self, event: BaseEvent, workflow: BaseWorkflow):
+        """Handle a step completion event for an active workflow"""
+        step_id = event.data.get("step_id")
+        step_status = event.data.get("step_status")
+        
+        logger.debug(f"🔄 Workflow {workflow.workflow_id} step {step_id} status: {step_status}")
+        
+        # Update workflow state based on step completion
+        # This would trigger the next step in the workflow
 
 
 # Global workflow engine instance
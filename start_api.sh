@@ -31,4 +31,4 @@ else
 fi
 
 echo "🚀 Starting API..."
-poetry run uvicorn src.api.main:app --reload --host 0.0.0.0 --port 8048
+poetry run uvicorn src.api.main:app --reload --loop uvloop --host 0.0.0.0 --port 8048
@@ -3,14 +3,24 @@ import asyncio
 import httpx
 import os
 from datetime import datetime
-from dotenv import load_dotenv
+from dotenv import dotenv_values
 
-# Load environment variables
-load_dotenv()
+
+def get_base_url() -> str:
+    """API base URL from the environment, parsing .env only when it isn't set"""
+    base_url = os.environ.get('NEXT_PUBLIC_API_URL')
+    if base_url is None:
+        base_url = dotenv_values().get('NEXT_PUBLIC_API_URL')
+    return base_url or 'http://localhost:8048'
 
 async def test_system():
-    async with httpx.AsyncClient(follow_redirects=True) as client:
-        base_url = os.getenv('NEXT_PUBLIC_API_URL', 'http://localhost:8048')
+    # Pooled HTTP/1.1 keep-alive connections serve the gathered requests below
+    async with httpx.AsyncClient(
+        follow_redirects=True,
+        limits=httpx.Limits(max_connections=500, max_keepalive_connections=100),
+        timeout=httpx.Timeout(30.0)
+    ) as client:
+        base_url = get_base_url()
         print("🔍 TESTING RESUME AUTOMATION API\n")
         
         # 1. Health check
@@ -35,17 +45,22 @@ async def test_system():
         headers = {"Authorization": f"Bearer {token}"}
         print("   ✅ Login successful")
         
+        # Independent authenticated reads run concurrently
+        me, usage, providers = await asyncio.gather(
+            client.get(f"{base_url}/api/v1/auth/me", headers=headers),
+            client.get(f"{base_url}/api/v1/auth/me/usage", headers=headers),
+            client.get(f"{base_url}/api/v1/generator/llm-providers", headers=headers)
+        )
+        
         # 3. User info
         print("\n3. Testing user endpoints...")
-        me = await client.get(f"{base_url}/api/v1/auth/me", headers=headers)
         user_data = me.json()
         print(f"   ✅ Current user: {user_data['email']}")
         print(f"      - Tier: {user_data['subscription_tier']}")
         print(f"      - Applications: {user_data['applications_count']}")
         print(f"      - Resumes generated: {user_data['resumes_generated_count']}")
         
-        # Get usage stats
-        usage = await client.get(f"{base_url}/api/v1/auth/me/usage", headers=headers)
+        # Usage stats
         if usage.status_code == 200:
             usage_data = usage.json()
             print("   ✅ Usage stats:")
@@ -89,6 +104,13 @@ async def test_system():
             json=app_data
         )
         
+        # List applications and statistics once the create has landed
+        apps, stats = await asyncio.gather(
+            client.get(f"{base_url}/api/v1/applications/", headers=headers),
+            client.get(f"{base_url}/api/v1/applications/stats/summary", headers=headers)
+        )
+        apps_data = apps.json()
+        
         app_id = None
         if app.status_code in [200, 201]:
             app_json = app.json()
@@ -96,18 +118,13 @@ async def test_system():
             print(f"   ✅ Created application ID: {app_id}")
         else:
             print(f"   ❌ Failed to create: {app.text}")
-            # Get existing application for testing
-            apps = await client.get(f"{base_url}/api/v1/applications/", headers=headers)
-            if apps.json():
-                app_id = apps.json()[0]["id"]
+            # Use an existing application for testing
+            if apps_data:
+                app_id = apps_data[0]["id"]
                 print(f"   ℹ️  Using existing application ID: {app_id}")
         
-        # List applications
-        apps = await client.get(f"{base_url}/api/v1/applications/", headers=headers)
-        print(f"   ✅ Total applications: {len(apps.json())}")
+        print(f"   ✅ Total applications: {len(apps_data)}")
         
-        # Get statistics
-        stats = await client.get(f"{base_url}/api/v1/applications/stats/summary", headers=headers)
         stats_data = stats.json()
         print("   ✅ Application stats:")
         print(f"      - Total: {stats_data['total_applications']}")
@@ -117,11 +134,7 @@ async def test_system():
         # 5. Test generator endpoints
         print("\n5. Testing AI/Generator endpoints...")
         
-        # Check LLM providers
-        providers = await client.get(
-            f"{base_url}/api/v1/generator/llm-providers",
-            headers=headers
-        )
+        # LLM providers
         if providers.status_code == 200:
             print(f"   ✅ Available LLM providers: {providers.json()}")
         else:
@@ -151,20 +164,22 @@ async def test_system():
         # 7. Test application updates
         if app_id:
             print("\n7. Testing application updates...")
-            update = await client.patch(
-                f"{base_url}/api/v1/applications/{app_id}",
-                headers=headers,
-                json={"status": "applied"}
+            # Status update and note are independent of each other
+            update, note = await asyncio.gather(
+                client.patch(
+                    f"{base_url}/api/v1/applications/{app_id}",
+                    headers=headers,
+                    json={"status": "applied"}
+                ),
+                client.post(
+                    f"{base_url}/api/v1/applications/{app_id}/notes",
+                    headers=headers,
+                    json={"note": "Submitted application with customized resume"}
+                )
             )
             if update.status_code == 200:
                 print("   ✅ Updated application status to 'applied'")
             
-            # Add a note
-            note = await client.post(
-                f"{base_url}/api/v1/applications/{app_id}/notes",
-                headers=headers,
-                json={"note": "Submitted application with customized resume"}
-            )
             if note.status_code in [200, 201]:
                 print("   ✅ Added note to application")
             else:
@@ -3,7 +3,9 @@
 Test LaTeX escaping functionality with various special characters.
 """
 
+import re
 import sys
+from collections import Counter
 from pathlib import Path
 
 # Add parent directory to path for imports
@@ -11,12 +13,22 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from src.generator.resume_generator import ResumeGenerator
 
+# One generator shared by all tests
+GENERATOR = ResumeGenerator()
+
+# Characters that must never appear unescaped in generated LaTeX,
+# matched when not preceded by a backslash; compiled once and shared
+_UNESCAPED_RE = re.compile(r'(?<!\\)([&%$#^_{}~<>|])')
+
+def count_unescaped(latex_content):
+    """Count dangerous characters not preceded by a backslash"""
+    # finditer streams matches, so no list of hits is built
+    return Counter(match.group(1) for match in _UNESCAPED_RE.finditer(latex_content))
+
 def test_latex_escaping():
     """Test LaTeX escaping with various special characters"""
     print("🧪 Testing LaTeX character escaping...")
     
-    generator = ResumeGenerator()
-    
     # Test cases with special characters
     test_cases = [
         ("Simple text", "Simple text"),
@@ -42,7 +54,7 @@ def test_latex_escaping():
     failed = 0
     
     for i, (input_text, expected) in enumerate(test_cases, 1):
-        result = generator._latex_escape(input_text)
+        result = GENERATOR._latex_escape(input_text)
         
         if result == expected:
             print(f"   ✅ Test {i:2d}: '{input_text}' → '{result}'")
@@ -66,8 +78,6 @@ def test_resume_with_special_chars():
     """Test full resume generation with special characters"""
     print("\n🧪 Testing resume generation with special characters...")
     
-    generator = ResumeGenerator()
-    
     # Create test data with lots of special characters
     test_data = {
         "name": "John O'Reilly & Associates",
@@ -106,25 +116,11 @@ def test_resume_with_special_chars():
     
     try:
         # Generate LaTeX
-        latex_content = generator.generate_latex("modern_professional", test_data)
+        latex_content = GENERATOR.generate_latex("modern_professional", test_data)
         print("   ✅ LaTeX generation successful")
         
         # Check for unescaped characters (these should NOT appear in output)
-        dangerous_chars = ['&', '%', '$', '#', '^', '_', '{', '}', '~', '<', '>', '|']
-        unescaped_found = []
-        
-        for char in dangerous_chars:
-            # Look for unescaped characters (not preceded by backslash)
-            import re
-            if char in ['\\', '^', '$', '|', '{', '}']:
-                # These need special regex escaping
-                pattern = f'(?<!\\\\)\\{char}'
-            else:
-                pattern = f'(?<!\\\\){re.escape(char)}'
-            
-            matches = re.findall(pattern, latex_content)
-            if matches:
-                unescaped_found.append((char, len(matches)))
+        unescaped_found = list(count_unescaped(latex_content).items())
         
         if unescaped_found:
             print(f"   ⚠️  Found unescaped characters: {unescaped_found}")
@@ -133,7 +129,7 @@ def test_resume_with_special_chars():
         
         # Try to compile PDF
         try:
-            pdf_path = generator.compile_latex_to_pdf(latex_content, "test_special_chars.pdf")
+            pdf_path = GENERATOR.compile_latex_to_pdf(latex_content, "test_special_chars.pdf")
             print(f"   ✅ PDF compilation successful: {pdf_path}")
             return True
         except Exception as pdf_error:
@@ -6,13 +6,10 @@ import asyncio
 import httpx
 import json
 import os
-from dotenv import load_dotenv
+# Importing src.core (via kafka_client -> config) loads .env once for the process
 from src.core.kafka_client import KafkaEventProducer
 from src.core.events import JobDiscoveredEvent, ResumeGenerationRequestedEvent
 
-# Load environment variables
-load_dotenv()
-
 async def test_resume_generation():
     """Test resume generation endpoint"""
     async with httpx.AsyncClient() as client:
@@ -23,7 +20,9 @@ async def test_resume_generation():
             f"{base_url}/api/v1/auth/login",
             data={"username": "test@example.com", "password": "password123"}
         )
-        token = login.json()["access_token"]
+        # Parse the login body once; the auth headers are reused for every request below
+        body = login.json()
+        token = body["access_token"]
         headers = {"Authorization": f"Bearer {token}"}
         
         # Test resume generation
@@ -5,6 +5,8 @@ Tests both basic LaTeX generation and AI-powered customization.
 """
 
 import asyncio
+import contextvars
+import io
 import sys
 import os
 import traceback
@@ -17,11 +19,17 @@ print("🚀 Starting resume generation test...")
 print(f"Python version: {sys.version}")
 print(f"Current directory: {Path.cwd()}")
 
+# Repeated test runs reuse compiled PDFs; production leaves the cache off
+os.environ.setdefault("RESUME_PDF_CACHE_ENABLED", "true")
+
 try:
     print("📦 Importing modules...")
-    from src.generator.resume_generator import ResumeGenerator
+    from src.generator.resume_generator import ResumeGenerator, pdflatex_version
     print("✅ ResumeGenerator imported")
     
+    # One generator shared by all tests
+    GENERATOR = ResumeGenerator()
+    
     from src.generator.example_data import FULL_RESUME_DATA, MINIMAL_RESUME_DATA
     print("✅ Example data imported")
     
@@ -41,36 +49,36 @@ async def test_basic_generation():
     print("\n🧪 Testing basic resume generation...")
     
     try:
-        generator = ResumeGenerator()
-        
         # Test with minimal data
         print("   📝 Testing minimal resume data...")
-        latex_content = generator.generate_latex("modern_professional", MINIMAL_RESUME_DATA)
-        print(f"   ✅ Generated LaTeX ({len(latex_content)} characters)")
-        
-        # Test PDF generation if pdflatex is available
-        try:
-            pdf_path = generator.compile_latex_to_pdf(latex_content, "test_minimal.pdf")
-            if pdf_path and Path(pdf_path).exists():
-                print(f"   ✅ Generated PDF: {pdf_path}")
-                print(f"      File size: {Path(pdf_path).stat().st_size} bytes")
-            else:
-                print("   ⚠️  PDF generation returned no path")
-        except Exception as pdf_error:
-            print(f"   ⚠️  PDF generation failed (this is OK if pdflatex not installed): {pdf_error}")
+        minimal_latex = GENERATOR.generate_latex("modern_professional", MINIMAL_RESUME_DATA)
+        print(f"   ✅ Generated LaTeX ({len(minimal_latex)} characters)")
         
         # Test with full data
         print("   📝 Testing full resume data...")
-        latex_content = generator.generate_latex("modern_professional", FULL_RESUME_DATA)
-        print(f"   ✅ Generated LaTeX ({len(latex_content)} characters)")
+        full_latex = GENERATOR.generate_latex("modern_professional", FULL_RESUME_DATA)
+        print(f"   ✅ Generated LaTeX ({len(full_latex)} characters)")
+        
+        # Test PDF generation if pdflatex is available; both compile concurrently
+        minimal_pdf, full_pdf = await asyncio.gather(
+            GENERATOR.compile_latex_to_pdf_async(minimal_latex, "test_minimal.pdf"),
+            GENERATOR.compile_latex_to_pdf_async(full_latex, "test_full.pdf"),
+            return_exceptions=True
+        )
+        
+        if isinstance(minimal_pdf, Exception):
+            print(f"   ⚠️  PDF generation failed (this is OK if pdflatex not installed): {minimal_pdf}")
+        elif minimal_pdf and Path(minimal_pdf).exists():
+            print(f"   ✅ Generated PDF: {minimal_pdf}")
+            print(f"      File size: {Path(minimal_pdf).stat().st_size} bytes")
+        else:
+            print("   ⚠️  PDF generation returned no path")
         
-        try:
-            pdf_path = generator.compile_latex_to_pdf(latex_content, "test_full.pdf")
-            if pdf_path and Path(pdf_path).exists():
-                print(f"   ✅ Generated PDF: {pdf_path}")
-                print(f"      File size: {Path(pdf_path).stat().st_size} bytes")
-        except Exception as pdf_error:
-            print(f"   ⚠️  PDF generation failed: {pdf_error}")
+        if isinstance(full_pdf, Exception):
+            print(f"   ⚠️  PDF generation failed: {full_pdf}")
+        elif full_pdf and Path(full_pdf).exists():
+            print(f"   ✅ Generated PDF: {full_pdf}")
+            print(f"      File size: {Path(full_pdf).stat().st_size} bytes")
         
         return True
         
@@ -115,7 +123,6 @@ async def test_template_availability():
     print("\n📄 Testing template availability...")
     
     try:
-        generator = ResumeGenerator()
         template_dir = Path(__file__).parent.parent / "src" / "generator" / "templates"
         
         print(f"   📁 Template directory: {template_dir}")
@@ -124,15 +131,16 @@ async def test_template_availability():
             print("   ❌ Template directory not found")
             return False
         
-        templates = list(template_dir.glob("*.tex"))
+        # Ask the loader for its listing rather than globbing the directory again
+        templates = [name for name in GENERATOR.env.list_templates() if name.endswith(".tex")]
         print(f"   ✅ Found {len(templates)} LaTeX templates:")
         
         for template in templates:
-            print(f"      - {template.name}")
+            print(f"      - {template}")
             
             # Test that template loads without error
             try:
-                template_obj = generator.env.get_template(template.name)
+                template_obj = GENERATOR.env.get_template(template)
                 print(f"        ✅ Template loads successfully")
             except Exception as template_error:
                 print(f"        ❌ Template load error: {template_error}")
@@ -180,25 +188,43 @@ def print_system_info():
     print(f"   - Platform: {sys.platform}")
     print(f"   - Working directory: {os.getcwd()}")
     
-    # Check for pdflatex
-    try:
-        import subprocess
-        result = subprocess.run(['pdflatex', '--version'], capture_output=True, text=True)
-        if result.returncode == 0:
-            version_line = result.stdout.split('\n')[0]
-            print(f"   - pdflatex: {version_line}")
-        else:
-            print("   - pdflatex: Not available")
-    except FileNotFoundError:
-        print("   - pdflatex: Not installed")
-    except Exception as e:
-        print(f"   - pdflatex: Error checking ({e})")
+    # Check for pdflatex (the generator probes it once per process and reuses the result)
+    version_line = pdflatex_version()
+    print(f"   - pdflatex: {version_line or 'Not available'}")
     
     # Check environment variables
     print(f"   - OPENAI_API_KEY: {'Set' if settings.openai_api_key else 'Not set'}")
     print(f"   - ANTHROPIC_API_KEY: {'Set' if settings.anthropic_api_key else 'Not set'}")
     print(f"   - DEFAULT_LLM_PROVIDER: {settings.default_llm_provider}")
 
+# Output buffer of the test running in the current task, so concurrent tests don't interleave
+_test_output: contextvars.ContextVar = contextvars.ContextVar("test_output", default=None)
+
+
+class TaskLocalStdout:
+    """Send writes to the current test's buffer, or to the real stdout outside a test"""
+    
+    def __init__(self, stream):
+        self.stream = stream
+    
+    def write(self, text):
+        return (_test_output.get() or self.stream).write(text)
+    
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+
+async def run_buffered(test_coro):
+    """Run one test with its output captured, returning (result or exception, output)"""
+    buffer = io.StringIO()
+    _test_output.set(buffer)  # gather() runs each test in its own task and context
+    try:
+        result = await test_coro
+    except Exception as e:
+        result = e
+    return result, buffer.getvalue()
+
+
 async def main():
     """Run all tests"""
     print_system_info()
@@ -210,19 +236,25 @@ async def main():
         ("AI Customization", test_ai_customization()),
     ]
     
-    results = []
+    # The tests touch disjoint resources, so the quick checks overlap the pdflatex
+    # runs; each test's output is buffered and printed under its own banner
+    sys.stdout = TaskLocalStdout(sys.stdout)
+    try:
+        outcomes = await asyncio.gather(*(run_buffered(test_coro) for _, test_coro in tests))
+    finally:
+        sys.stdout = sys.stdout.stream
     
-    for test_name, test_coro in tests:
+    results = []
+    for (test_name, _), (result, output) in zip(tests, outcomes):
         print(f"\n{'='*50}")
         print(f"Running: {test_name}")
         print('='*50)
+        print(output, end="")
         
-        try:
-            result = await test_coro
-            results.append((test_name, result))
-        except Exception as e:
-            print(f"❌ Test '{test_name}' crashed: {e}")
-            results.append((test_name, False))
+        if isinstance(result, Exception):
+            print(f"❌ Test '{test_name}' crashed: {result}")
+            result = False
+        results.append((test_name, result))
     
     # Summary
     print(f"\n{'='*50}")